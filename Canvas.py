@@ -1,14 +1,33 @@
 ﻿"""Canvas widget for drawing obstacles and grid"""
 from PyQt5.QtWidgets import QWidget, QScrollArea, QMessageBox
-from PyQt5.QtCore import Qt, QPoint, QRect, QPointF
-from PyQt5.QtGui import QPainter, QPen, QColor, QBrush, QCursor, QPolygonF
+from PyQt5.QtCore import Qt, QEvent, QPoint, QRect, QPointF, QRectF, QTimer
+from PyQt5.QtGui import QPainter, QPen, QColor, QBrush, QCursor, QPolygonF, QPixmap, QPainterPath
 import math
+import numpy as np
 from collisionBoxExpansion import ObstacleExpander
+from CollisionDetector import CollisionDetector
+from SpatialHash import SpatialHash
+from collision_numba import aabb_candidates
+from utils import calculate_polygon_points, calculate_polygons_points, polygon_from_array
 
 
 class Canvas(QWidget):
     """Main canvas widget for drawing obstacles and grid"""
     
+    # Extra pixels around an obstacle's bounds repainted on change (pen widths + antialiasing)
+    DIRTY_MARGIN = 4
+    
+    # Minimum interval (ms) between drag updates, about 60 per second
+    DRAG_UPDATE_INTERVAL = 16
+    
+    # Minimum interval (ms) between repaints requested through schedule_repaint
+    REPAINT_INTERVAL = 16
+    
+    # Default cell size (pixels) of the spatial hash used to look up obstacles by position,
+    # and the range the cell size is kept in when it adapts to the obstacle sizes
+    INDEX_CELL_SIZE = 128
+    INDEX_CELL_RANGE = (32, 512)
+    
     def __init__(self):
         super().__init__()
         # Fixed canvas size: 2048x2048
@@ -16,8 +35,18 @@ class Canvas(QWidget):
         self.canvas_height = 2048
         self.setFixedSize(self.canvas_width, self.canvas_height)
         self.setMouseTracking(True)
+        
+        # The grid pixmap covers every pixel, so Qt doesn't need to clear the background
+        self.setAttribute(Qt.WA_OpaquePaintEvent, True)
+        self.setAttribute(Qt.WA_NoSystemBackground, True)
         self.grid_size = 20
         
+        # Grid lines as a single path, the pre-rendered grid background, and the grid
+        # with every obstacle except the selected one on top (both built lazily in paintEvent)
+        self._grid_path = self.build_grid_path()
+        self._grid_pixmap = None
+        self._static_pixmap = None
+        
         # Panning variables
         self.is_panning = False
         self.last_pan_point = QPoint()
@@ -28,8 +57,18 @@ class Canvas(QWidget):
         # Obstacles list
         self.obstacles = []
         
+        # Collision bounds of every obstacle as parallel arrays (row i = self.obstacles[i]),
+        # so overlap checks can reject far-away obstacles in one vectorized test,
+        # plus a spatial hash mapping grid cells to the rows whose bounds touch them.
+        # The boxes already account for rotation and collision boxes. A second array holds
+        # the area each obstacle paints over, for culling when redrawing part of the canvas.
+        self._reset_obstacle_index()
+        
         # Selection
-        self.selected_obstacle = None
+        self._selected_obstacle = None
+        
+        # Main window this canvas belongs to (resolved by get_main_window)
+        self._main_window = None
         
         # Moving state
         self.is_moving = False
@@ -51,14 +90,37 @@ class Canvas(QWidget):
         # Polygon drawing state
         self.is_drawing_polygon = False
         
+        # Drag coalescing: mouse moves while moving, rotating or drawing only record
+        # the latest position, which the timer applies at most once per interval
+        self._pending_pos = None
+        self._drag_timer = QTimer(self)
+        self._drag_timer.setSingleShot(True)
+        self._drag_timer.timeout.connect(self.apply_drag_update)
+        
+        # Repaint coalescing: bursts of property edits share one full repaint per interval
+        self._repaint_timer = QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.timeout.connect(self.update)
+        
         # Default obstacle color
         self.obstacle_color = QColor(100, 150, 200)
         
+        # Pens and brushes reused on every paint
+        self._pen_grid = QPen(QColor(200, 200, 200), 1)
+        self._pen_normal = QPen(QColor(50, 50, 50), 2)
+        self._pen_selected = QPen(QColor(255, 200, 0), 4)
+        self._pen_overlap = QPen(QColor(255, 0, 0), 4)
+        self._brush_overlap = QBrush(QColor(255, 0, 0, 30))
+        self._pen_expand_dash = QPen(QColor(128, 128, 128), 2, Qt.DashLine)
+        self._brush_expand = QBrush(QColor(128, 128, 128, 40))
+        self._pen_handle = QPen(QColor(255, 0, 0), 2)
+        self._brush_handle = QBrush(QColor(255, 100, 100))
+        self._pen_preview = QPen(QColor(), 2, Qt.DashLine)  # color set per draw
+        self._preview_brushes = {}  # color.rgb() -> QBrush with that color at alpha 50
+        
         # Obstacle expander (initialized with 0 expansion distance by default)
         self.expander = ObstacleExpander(expansion_distance=0)
         
-        # Import collision detector
-        from CollisionDetector import CollisionDetector
         from PolygonEditor import PolygonEditor
         
         self.collision_detector = CollisionDetector()
@@ -66,10 +128,19 @@ class Canvas(QWidget):
         
     def paintEvent(self, event):
         """Draw the canvas with grid"""
+        if self._static_pixmap is None:
+            self._static_pixmap = self.build_static_pixmap()
+        
+        # Only the dirty region needs repainting; the selected obstacle is the only
+        # one not already in the pixmap
+        rect = event.rect()
         painter = QPainter(self)
-        painter.fillRect(self.rect(), QColor(255, 255, 255))
-        self.draw_grid(painter)
-        self.draw_obstacles(painter)
+        painter.drawPixmap(rect, self._static_pixmap, rect)
+        
+        selected = self.selected_obstacle
+        if (selected is not None and id(selected) in self._rows and
+                self.obstacle_dirty_rect(selected).intersects(rect)):
+            self.draw_obstacle(painter, selected)
         
         if self.is_drawing and self.current_preview_shape:
             self.draw_preview_shape(painter)
@@ -78,117 +149,174 @@ class Canvas(QWidget):
         if self.is_drawing_polygon:
             self.polygon_editor.draw_preview(painter)
         
-    def draw_grid(self, painter):
-        """Draw the grid lines"""
-        pen = QPen(QColor(200, 200, 200), 1)
-        painter.setPen(pen)
+    def build_grid_pixmap(self):
+        """Render the white background and grid once into a pixmap"""
+        pixmap = QPixmap(self.canvas_width, self.canvas_height)
+        pixmap.fill(QColor(255, 255, 255))
+        
+        painter = QPainter(pixmap)
+        self.draw_grid(painter)
+        painter.end()
+        
+        return pixmap
+    
+    def build_static_pixmap(self):
+        """Render the grid and every unselected obstacle into a pixmap"""
+        if self._grid_pixmap is None:
+            self._grid_pixmap = self.build_grid_pixmap()
+        
+        pixmap = QPixmap(self._grid_pixmap)
+        self._build_regular_polygons()
+        
+        painter = QPainter(pixmap)
+        self.draw_obstacles(painter, skip=self.selected_obstacle)
+        painter.end()
+        
+        return pixmap
+    
+    def invalidate_static(self):
+        """Rebuild the pixmap of unselected obstacles on the next paint"""
+        self._static_pixmap = None
+    
+    def repaint_static_region(self, rect):
+        """Redraw one area of the static pixmap from the grid and the unselected obstacles reaching into it"""
+        if self._static_pixmap is None:
+            return
+        
+        painter = QPainter(self._static_pixmap)
+        painter.setClipRect(rect)
+        painter.drawPixmap(rect, self._grid_pixmap, rect)
+        self.draw_obstacles(painter, skip=self.selected_obstacle, rows=self._rows_in_rect(rect))
+        painter.end()
+    
+    @property
+    def selected_obstacle(self):
+        """The obstacle currently selected, or None"""
+        return self._selected_obstacle
+    
+    @selected_obstacle.setter
+    def selected_obstacle(self, obstacle):
+        if obstacle is not self._selected_obstacle:
+            previous = self._selected_obstacle
+            self._selected_obstacle = obstacle
+            
+            # Only the areas of the old and new selection differ in the static pixmap
+            for changed in (previous, obstacle):
+                if changed is not None and id(changed) in self._rows:
+                    self.repaint_static_region(self.obstacle_dirty_rect(changed))
+    
+    def build_grid_path(self):
+        """Build one path containing every grid line"""
+        path = QPainterPath()
         
         for x in range(0, self.canvas_width + 1, self.grid_size):
-            painter.drawLine(x, 0, x, self.canvas_height)
+            path.moveTo(x, 0)
+            path.lineTo(x, self.canvas_height)
             
         for y in range(0, self.canvas_height + 1, self.grid_size):
-            painter.drawLine(0, y, self.canvas_width, y)
+            path.moveTo(0, y)
+            path.lineTo(self.canvas_width, y)
+        
+        return path
     
-    def draw_obstacles(self, painter):
-        """Draw all obstacles on the canvas"""
-        for obstacle in self.obstacles:
-            is_selected = (obstacle == self.selected_obstacle)
-            
-            has_overlap = is_selected and self.is_moving and self.move_has_overlap
-            
-            # Draw expanded obstacle first (if expansion is set)
-            expansion_dist = obstacle.get('expansion_distance', 0)
-            use_directional = obstacle.get('use_directional_expansion', False)
-            
-            # Draw expansion if either uniform or directional expansion is set
-            if expansion_dist > 0 or use_directional:
-                self.draw_expanded_obstacle(painter, obstacle)
-            
-            # Draw original obstacle
-            self.draw_single_obstacle(painter, obstacle, preview=False, selected=is_selected, has_overlap=has_overlap)
-            
-            # Draw rotation handle if selected AND obstacle can rotate
-            if is_selected and not obstacle.get('can_rotate', True) == False:
-                self.draw_rotation_handle(painter, obstacle)
+    def draw_grid(self, painter):
+        """Draw the grid lines"""
+        painter.setPen(self._pen_grid)
+        painter.setBrush(Qt.NoBrush)
+        painter.drawPath(self._grid_path)
+    
+    def draw_obstacles(self, painter, skip=None, rows=None):
+        """Draw all obstacles on the canvas (or those in rows, in ascending order), except skip
+        
+        Runs of consecutive unrotated rectangles without a collision box are drawn with
+        one drawRects call per fill color. Obstacles themselves never overlap, so only
+        the order within such a run changes; collision boxes still stack as before.
+        """
+        plain_rects = {}  # color.rgba() -> (brush, [QRectF]) of the current run
+        draw_obstacle = self.draw_obstacle  # bound once for the loop
+        obstacles = self.obstacles if rows is None else [self.obstacles[row] for row in rows]
+        for obstacle in obstacles:
+            if obstacle is skip:
+                continue
+            get = obstacle.get
+            if (obstacle['type'] == 'rectangle' and not get('rotation', 0)
+                    and not get('expansion_distance', 0)
+                    and not get('use_directional_expansion', False)):
+                key = obstacle['color'].rgba()
+                group = plain_rects.get(key)
+                if group is None:
+                    group = plain_rects[key] = (self._get_brush(obstacle), [])
+                group[1].append(QRectF(obstacle['x'], obstacle['y'], obstacle['width'], obstacle['height']))
+            else:
+                if plain_rects:
+                    self._draw_plain_rects(painter, plain_rects)
+                    plain_rects = {}
+                draw_obstacle(painter, obstacle)
+        
+        if plain_rects:
+            self._draw_plain_rects(painter, plain_rects)
+    
+    def _draw_plain_rects(self, painter, plain_rects):
+        """Draw a run of plain rectangles grouped by fill color, one drawRects call per color"""
+        painter.setPen(self._pen_normal)
+        for brush, rects in plain_rects.values():
+            painter.setBrush(brush)
+            painter.drawRects(rects)
+    
+    def draw_obstacle(self, painter, obstacle):
+        """Draw an obstacle with its collision box and, when selected, its rotation handle"""
+        is_selected = (obstacle is self.selected_obstacle)
+        
+        has_overlap = is_selected and self.is_moving and self.move_has_overlap
+        
+        # Draw expanded obstacle first (if expansion is set)
+        expansion_dist = obstacle.get('expansion_distance', 0)
+        use_directional = obstacle.get('use_directional_expansion', False)
+        
+        # Draw expansion if either uniform or directional expansion is set
+        if expansion_dist > 0 or use_directional:
+            self.draw_expanded_obstacle(painter, obstacle)
+        
+        # Draw original obstacle
+        self.draw_single_obstacle(painter, obstacle, preview=False, selected=is_selected, has_overlap=has_overlap)
+        
+        # Draw rotation handle if selected AND obstacle can rotate
+        if is_selected and not obstacle.get('can_rotate', True) == False:
+            self.draw_rotation_handle(painter, obstacle)
     
     def draw_expanded_obstacle(self, painter, obstacle):
         """Draw the expanded version of an obstacle (collision box)"""
         try:
-            expanded_data = self.expander.expand_obstacle(obstacle)
+            expanded_data = self._get_expanded_data(obstacle)
             
             if not expanded_data:
                 return
             
-            # Save painter state
-            painter.save()
-            
-            # Check if using directional expansion
-            use_directional = obstacle.get('use_directional_expansion', False)
-            method = obstacle.get('expansion_method', ObstacleExpander.METHOD_GENERALIZED)
-            obstacle_type = obstacle.get('type')
-            
-            if use_directional and obstacle_type in ['rectangle', 'triangle', 'pentagon', 'hexagon']:
-                # Directional expansion - check method to see what was returned
-                if method == ObstacleExpander.METHOD_GENERALIZED:
-                    # Generalized method returns (edges, arc_centers, arc_radius)
-                    edges, arc_centers, radius = expanded_data
-                    
-                    # Draw edges
-                    pen = QPen(QColor(128, 128, 128), 2, Qt.DashLine)
-                    painter.setPen(pen)
-                    painter.setBrush(Qt.NoBrush)
-                    
-                    for edge in edges:
-                        painter.drawLine(edge[0], edge[1])
-                    
-                    # Draw arcs at corners
-                    for center in arc_centers:
-                        painter.drawEllipse(center, radius, radius)
-                else:
-                    # Preserve shape or convex - returns list of vertices
-                    pen = QPen(QColor(128, 128, 128), 2, Qt.DashLine)
-                    brush = QBrush(QColor(128, 128, 128, 40))
-                    
-                    painter.setPen(pen)
-                    painter.setBrush(brush)
-                    
-                    polygon = QPolygonF(expanded_data)
-                    painter.drawPolygon(polygon)
+            # The drawing style was decided when the expansion was computed
+            if obstacle['_render_kind'] == 'edges_arcs':
+                self._draw_edges_arcs(painter, obstacle, expanded_data)
             else:
-                # Non-directional expansion - draw based on method
-                if method == ObstacleExpander.METHOD_GENERALIZED:
-                    # Draw edges and arcs
-                    edges, arc_centers, radius = expanded_data
-                    
-                    # Draw edges
-                    pen = QPen(QColor(128, 128, 128), 2, Qt.DashLine)
-                    painter.setPen(pen)
-                    painter.setBrush(Qt.NoBrush)
-                    
-                    for edge in edges:
-                        painter.drawLine(edge[0], edge[1])
-                    
-                    # Draw arcs at corners
-                    for center in arc_centers:
-                        painter.drawEllipse(center, radius, radius)
-                    
-                else:
-                    # preserve_shape or convex - draw polygon
-                    pen = QPen(QColor(128, 128, 128), 2, Qt.DashLine)
-                    brush = QBrush(QColor(128, 128, 128, 40))
-                    
-                    painter.setPen(pen)
-                    painter.setBrush(brush)
-                    
-                    polygon = QPolygonF(expanded_data)
-                    painter.drawPolygon(polygon)
-            
-            # Restore painter state
-            painter.restore()
+                self._draw_exp_polygon(painter, expanded_data)
             
         except Exception as e:
             print(f"Error drawing expanded obstacle: {e}")
     
+    def _draw_edges_arcs(self, painter, obstacle, expanded_data):
+        """Draw a generalized collision box: offset edges plus corner arcs"""
+        edges, arc_centers, radius = expanded_data
+        edge_path, arc_path = self._get_expansion_paths(obstacle, edges, arc_centers, radius)
+        
+        painter.setPen(self._pen_expand_dash)
+        painter.setBrush(Qt.NoBrush)
+        painter.drawPath(edge_path)
+        painter.drawPath(arc_path)
+    
+    def _draw_exp_polygon(self, painter, expanded_data):
+        """Draw a preserve_shape or convex collision box polygon"""
+        painter.setPen(self._pen_expand_dash)
+        painter.setBrush(self._brush_expand)
+        painter.drawPolygon(expanded_data)
+    
     def draw_single_obstacle(self, painter, obstacle, preview=False, selected=False, has_overlap=False):
         """Draw a single obstacle shape"""
         shape_type = obstacle['type']
@@ -199,12 +327,11 @@ class Canvas(QWidget):
         color = obstacle['color']
         rotation = obstacle.get('rotation', 0)
         
-        # Save painter state
-        painter.save()
-        
-        # Apply rotation if needed
+        # Apply rotation if needed; only then is there painter state to restore
         can_rotate = obstacle.get('can_rotate', True)
-        if rotation != 0 and can_rotate:
+        needs_transform = can_rotate and 0.01 < rotation % 360.0 < 359.99
+        if needs_transform:
+            painter.save()
             center_x = x + width / 2
             center_y = y + height / 2
             painter.translate(center_x, center_y)
@@ -213,17 +340,21 @@ class Canvas(QWidget):
         
         # Set up painter based on state
         if has_overlap:
-            pen = QPen(QColor(255, 0, 0), 4)
-            brush = QBrush(QColor(255, 0, 0, 30))
+            pen = self._pen_overlap
+            brush = self._brush_overlap
         elif preview:
-            pen = QPen(color, 2, Qt.DashLine)
-            brush = QBrush(QColor(color.red(), color.green(), color.blue(), 50))
+            pen = self._pen_preview
+            pen.setColor(color)
+            brush = self._preview_brushes.get(color.rgb())
+            if brush is None:
+                brush = QBrush(QColor(color.red(), color.green(), color.blue(), 50))
+                self._preview_brushes[color.rgb()] = brush
         elif selected:
-            pen = QPen(QColor(255, 200, 0), 4)
-            brush = QBrush(color)
+            pen = self._pen_selected
+            brush = self._get_brush(obstacle)
         else:
-            pen = QPen(QColor(50, 50, 50), 2)
-            brush = QBrush(color)
+            pen = self._pen_normal
+            brush = self._get_brush(obstacle)
         
         painter.setPen(pen)
         painter.setBrush(brush)
@@ -231,31 +362,288 @@ class Canvas(QWidget):
         # Draw based on shape type
         if shape_type == 'rectangle':
             painter.drawRect(x, y, width, height)
-        elif shape_type == 'triangle':
+        else:
+            polygon = self._get_polygon(obstacle)
+            if polygon is not None:
+                painter.drawPolygon(polygon)
+        
+        if needs_transform:
+            painter.restore()
+    
+    def _get_expanded_data(self, obstacle):
+        """
+        Get the expansion geometry of an obstacle, recomputing it only when its inputs changed
+        
+        Returns:
+            QPolygonF for preserve_shape/convex, or a tuple of ((N, 2, 2) edge array,
+            (N, 2) arc center array, arc radius) for generalized. None if nothing is expanded.
+        """
+        key = self.collision_detector.geometry_key(obstacle)
+        if obstacle.get('_exp_key') != key:
+            raw = self.expander.expand_obstacle_raw(obstacle)
+            
+            # Generalized expansions (directional or not) come back as edges and arcs, kept as
+            # arrays until the paths are built; the other methods as a polygon
+            if raw is None:
+                data = None
+                method = obstacle.get('expansion_method', ObstacleExpander.METHOD_GENERALIZED)
+            else:
+                method, expanded = raw
+                if method == ObstacleExpander.METHOD_GENERALIZED:
+                    edges, arc_centers, radius = expanded
+                    data = (np.asarray(edges, dtype=np.float64).reshape(-1, 2, 2),
+                            np.asarray(arc_centers, dtype=np.float64).reshape(-1, 2), radius)
+                else:
+                    data = polygon_from_array(expanded)
+            
+            obstacle['_exp_data'] = data
+            obstacle['_exp_key'] = key
+            obstacle['_render_kind'] = 'edges_arcs' if method == ObstacleExpander.METHOD_GENERALIZED else 'polygon'
+            obstacle.pop('_exp_paths', None)
+        return obstacle['_exp_data']
+    
+    def _get_expansion_paths(self, obstacle, edges, arc_centers, radius):
+        """Get the generalized expansion of an obstacle as an edge path and an arc path"""
+        paths = obstacle.get('_exp_paths')
+        if paths is None:
+            edge_path = QPainterPath()
+            for x1, y1, x2, y2 in edges.reshape(-1, 4).tolist():
+                edge_path.moveTo(x1, y1)
+                edge_path.lineTo(x2, y2)
+            
+            arc_path = QPainterPath()
+            diameter = radius * 2
+            for cx, cy in arc_centers.tolist():
+                arc_path.addEllipse(cx - radius, cy - radius, diameter, diameter)
+            
+            paths = obstacle['_exp_paths'] = (edge_path, arc_path)
+        return paths
+    
+    def _get_brush(self, obstacle):
+        """Get the fill brush of an obstacle, rebuilding it if its color changed"""
+        color = obstacle['color']
+        brush = obstacle.get('_brush')
+        if brush is None or brush.color() != color:
+            brush = QBrush(color)
+            obstacle['_brush'] = brush
+        return brush
+    
+    def _get_polygon(self, obstacle):
+        """Get the unrotated outline of a polygon obstacle, cached on the obstacle
+        
+        The cache is dropped by obstacle_changed() whenever the obstacle is moved or resized.
+        """
+        if '_poly_cache' not in obstacle:
+            obstacle['_poly_cache'] = self._build_polygon(obstacle)
+        return obstacle['_poly_cache']
+    
+    def _build_regular_polygons(self):
+        """Fill the outline cache of every pentagon and hexagon missing one in a single batch"""
+        pending = [obstacle for obstacle in self.obstacles
+                   if obstacle['type'] in ('pentagon', 'hexagon') and '_poly_cache' not in obstacle]
+        if len(pending) < 2:
+            return
+        
+        outlines = calculate_polygons_points(
+            [obstacle['x'] + obstacle['width'] * 0.5 for obstacle in pending],
+            [obstacle['y'] + obstacle['height'] * 0.5 for obstacle in pending],
+            [min(obstacle['width'], obstacle['height']) * 0.5 for obstacle in pending],
+            [5 if obstacle['type'] == 'pentagon' else 6 for obstacle in pending])
+        for obstacle, points in zip(pending, outlines):
+            obstacle['_poly_cache'] = QPolygonF(points)
+    
+    def _build_polygon(self, obstacle):
+        """Build the unrotated outline polygon of a non-rectangle obstacle"""
+        shape_type = obstacle['type']
+        x = obstacle['x']
+        y = obstacle['y']
+        width = obstacle['width']
+        height = obstacle['height']
+        
+        if shape_type == 'triangle':
             points = [
-                QPoint(x + width // 2, y),
-                QPoint(x, y + height),
-                QPoint(x + width, y + height)
+                QPointF(x + width * 0.5, y),
+                QPointF(x, y + height),
+                QPointF(x + width, y + height)
             ]
-            painter.drawPolygon(QPolygonF(points))
+            return QPolygonF(points)
         elif shape_type == 'pentagon':
-            cx = x + width // 2
-            cy = y + height // 2
-            radius = min(width, height) // 2
-            points = self.calculate_regular_polygon_points(cx, cy, radius, 5)
-            painter.drawPolygon(QPolygonF(points))
+            cx = x + width * 0.5
+            cy = y + height * 0.5
+            radius = min(width, height) * 0.5
+            return self.calculate_regular_polygon_points(cx, cy, radius, 5)
         elif shape_type == 'hexagon':
-            cx = x + width // 2
-            cy = y + height // 2
-            radius = min(width, height) // 2
-            points = self.calculate_regular_polygon_points(cx, cy, radius, 6)
-            painter.drawPolygon(QPolygonF(points))
+            cx = x + width * 0.5
+            cy = y + height * 0.5
+            radius = min(width, height) * 0.5
+            return self.calculate_regular_polygon_points(cx, cy, radius, 6)
         elif shape_type == 'custom_polygon' and 'points' in obstacle:
-            # Draw custom polygon (NO ROTATION)
-            points = [QPointF(p.x() + x, p.y() + y) for p in obstacle['points']]
-            painter.drawPolygon(QPolygonF(points))
+            # Custom polygon (NO ROTATION)
+            return QPolygonF(obstacle['points']).translated(x, y)
+        return None
+    
+    def obstacle_changed(self, obstacle):
+        """Drop geometry cached on an obstacle after it was moved, resized, rotated or re-expanded"""
+        obstacle.pop('_poly_cache', None)
+        obstacle.pop('_poly_key', None)
+        obstacle.pop('_exp_key', None)
+        obstacle.pop('_exp_data', None)
+        obstacle.pop('_exp_paths', None)
+        obstacle.pop('_verts_cache', None)
+        obstacle.pop('_vertices_cache', None)
+        obstacle.pop('_expanded_cache', None)
+        obstacle.pop('_world_cache', None)
+        obstacle.pop('_expander_vertices', None)
+        obstacle.pop('_expansion_cache', None)
+        
+        if obstacle is not self.selected_obstacle:
+            self.invalidate_static()
+        
+        row = self._rows.get(id(obstacle))
+        if row is not None:
+            vertices = self.collision_detector.get_collision_vertices(obstacle)
+            self._xs[row], self._ys[row], self._ws[row], self._hs[row] = \
+                self.collision_detector.get_collision_bounds(obstacle, vertices)
+            self._obbs[row] = self.collision_detector.get_collision_obb(obstacle, vertices)
+            self._draw_boxes[row] = self._draw_box(obstacle)
+            self._index_insert(row)
+    
+    def add_obstacle(self, obstacle):
+        """Append an obstacle and its collision bounds"""
+        vertices = self.collision_detector.get_collision_vertices(obstacle)
+        x, y, width, height = self.collision_detector.get_collision_bounds(obstacle, vertices)
+        corners = self.collision_detector.get_collision_obb(obstacle, vertices)
+        
+        row = len(self.obstacles)
+        self._rows[id(obstacle)] = row
+        self.obstacles.append(obstacle)
+        self._xs = np.append(self._xs, x)
+        self._ys = np.append(self._ys, y)
+        self._ws = np.append(self._ws, width)
+        self._hs = np.append(self._hs, height)
+        self._obbs = np.append(self._obbs, corners[np.newaxis], axis=0)
+        self._draw_boxes = np.append(self._draw_boxes, [self._draw_box(obstacle)], axis=0)
+        self._index_insert(row)
+        self.invalidate_static()
+    
+    def remove_obstacle(self, obstacle):
+        """Remove an obstacle (matched by identity) and its collision bounds"""
+        row = self._rows[id(obstacle)]
+        
+        del self.obstacles[row]
+        self._xs = np.delete(self._xs, row)
+        self._ys = np.delete(self._ys, row)
+        self._ws = np.delete(self._ws, row)
+        self._hs = np.delete(self._hs, row)
+        self._obbs = np.delete(self._obbs, row, axis=0)
+        self._draw_boxes = np.delete(self._draw_boxes, row, axis=0)
+        self._rows = {id(o): i for i, o in enumerate(self.obstacles)}
+        
+        # Rows after the removed one shifted down, so rebuild the index, with cells
+        # sized to the typical obstacle
+        if self.obstacles:
+            low, high = self.INDEX_CELL_RANGE
+            cell_size = int(np.clip(np.median(np.maximum(self._ws, self._hs)), low, high))
+        else:
+            cell_size = self.INDEX_CELL_SIZE
+        
+        self._spatial_hash = SpatialHash(cell_size)
+        columns = zip(self._xs.tolist(), self._ys.tolist(), self._ws.tolist(), self._hs.tolist())
+        for i, (x, y, width, height) in enumerate(columns):
+            self._spatial_hash.insert(i, x, y, x + width, y + height)
+        
+        self.invalidate_static()
+    
+    def _reset_obstacle_index(self):
+        """Empty the collision bounds arrays and the spatial hash"""
+        self._xs = np.empty(0)
+        self._ys = np.empty(0)
+        self._ws = np.empty(0)
+        self._hs = np.empty(0)
+        self._obbs = np.empty((0, 4, 2))  # corners of each rotation-aligned box
+        self._draw_boxes = np.empty((0, 4))  # (x1, y1, x2, y2) painted by each obstacle
+        self._rows = {}  # id(obstacle) -> row
+        self._spatial_hash = SpatialHash(self.INDEX_CELL_SIZE)  # keyed by row
+        self.invalidate_static()
+    
+    def _draw_box(self, obstacle):
+        """Get the painted area of an obstacle as an (x1, y1, x2, y2) row for _draw_boxes"""
+        rect = self.obstacle_dirty_rect(obstacle)
+        return (rect.left(), rect.top(), rect.left() + rect.width(), rect.top() + rect.height())
+    
+    def _rows_in_rect(self, rect):
+        """Get the rows of the obstacles painting inside a QRect, in ascending order"""
+        boxes = self._draw_boxes
+        mask = ((boxes[:, 0] <= rect.left() + rect.width()) & (boxes[:, 2] >= rect.left()) &
+                (boxes[:, 1] <= rect.top() + rect.height()) & (boxes[:, 3] >= rect.top()))
+        return np.nonzero(mask)[0]
+    
+    def _index_insert(self, row):
+        """Add or move a row in the spatial hash according to its collision bounds"""
+        self._spatial_hash.update(
+            row,
+            self._xs[row], self._ys[row],
+            self._xs[row] + self._ws[row], self._ys[row] + self._hs[row]
+        )
+    
+    def _fast_aabb_candidates(self, x, y, width, height):
+        """Get row indices of obstacles whose collision bounds come within the minimum gap of a box"""
+        gap = max(self.collision_detector.min_spacing, CollisionDetector.COLLISION_BOX_MIN_GAP)
+        x1, y1 = x - gap, y - gap
+        x2, y2 = x + width + gap, y + height + gap
+        
+        # Rows registered in the spatial hash cells around the box...
+        rows = np.array(sorted(self._spatial_hash.query(x1, y1, x2, y2)), dtype=np.intp)
+        
+        # ...narrowed down to those whose bounds actually reach it
+        hits = aabb_candidates(self._xs[rows], self._ys[rows], self._ws[rows], self._hs[rows],
+                               float(x1), float(y1), float(x2), float(y2))
+        rows = rows[hits]
+        
+        # Rotated obstacles fill their bounds poorly; drop those whose rotation-aligned
+        # box is separated from the query box
+        return rows[self._sat_overlaps(self._obbs[rows], x1, y1, x2, y2)]
+    
+    @staticmethod
+    def _sat_overlaps(corners, x1, y1, x2, y2):
+        """Separating axis test between many boxes and one axis-aligned box
+        
+        Args:
+            corners: Array of shape (N, 4, 2) with the corners of each box in order
+            x1, y1, x2, y2: Corners of the axis-aligned box
+            
+        Returns:
+            Boolean array of shape (N,), True where no separating axis exists (touching counts)
+        """
+        box = np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=float)
+        
+        # The two box axes plus the two edge directions of every box: shape (N, 4, 2)
+        n = len(corners)
+        axes = np.empty((n, 4, 2))
+        axes[:, 0] = (1.0, 0.0)
+        axes[:, 1] = (0.0, 1.0)
+        axes[:, 2] = corners[:, 1] - corners[:, 0]
+        axes[:, 3] = corners[:, 3] - corners[:, 0]
         
-        painter.restore()
+        # Project every corner onto every axis: shape (N, axis, corner)
+        proj_boxes = np.einsum('nkj,naj->nak', corners, axes)
+        proj_query = np.einsum('kj,naj->nak', box, axes)
+        
+        # Small tolerance keeps boxes that only touch within rounding error
+        eps = 1e-6 * (1.0 + np.abs(proj_boxes).max(axis=2))
+        separated = ((np.maximum.reduce(proj_boxes, axis=2) < np.minimum.reduce(proj_query, axis=2) - eps) |
+                     (np.maximum.reduce(proj_query, axis=2) < np.minimum.reduce(proj_boxes, axis=2) - eps))
+        return ~separated.any(axis=1)
+    
+    def check_obstacle_overlap(self, obstacle, exclude=None):
+        """Check an obstacle against the obstacles near it on the canvas"""
+        rows = self._fast_aabb_candidates(*self.collision_detector.get_collision_bounds(obstacle))
+        
+        return self.collision_detector.check_overlap(
+            obstacle,
+            [self.obstacles[row] for row in rows],
+            exclude=exclude
+        )
     
     def draw_preview_shape(self, painter):
         """Draw preview of shape being drawn"""
@@ -284,8 +672,8 @@ class Canvas(QWidget):
         y = obstacle['y']
         handle_pos = QPoint(int(x), int(y))
         
-        painter.setPen(QPen(QColor(255, 0, 0), 2))
-        painter.setBrush(QBrush(QColor(255, 100, 100)))
+        painter.setPen(self._pen_handle)
+        painter.setBrush(self._brush_handle)
         painter.drawEllipse(
             handle_pos.x() - self.rotation_handle_size,
             handle_pos.y() - self.rotation_handle_size,
@@ -293,19 +681,67 @@ class Canvas(QWidget):
             self.rotation_handle_size * 2
         )
     
-    def calculate_regular_polygon_points(self, cx, cy, radius, num_sides):
-        """Calculate points for a regular polygon"""
-        points = []
-        angle_step = 2 * math.pi / num_sides
-        start_angle = -math.pi / 2
+    def obstacle_dirty_rect(self, obstacle):
+        """Get the widget area covered by an obstacle, its collision box and rotation handle"""
+        x = obstacle['x']
+        y = obstacle['y']
+        width = obstacle['width']
+        height = obstacle['height']
+        rotation = obstacle.get('rotation', 0)
         
-        for i in range(num_sides):
-            angle = start_angle + i * angle_step
-            x = cx + radius * math.cos(angle)
-            y = cy + radius * math.sin(angle)
-            points.append(QPoint(int(x), int(y)))
+        if rotation != 0 and obstacle.get('can_rotate', True):
+            # A rotated shape always stays inside the circle around its center
+            radius = math.hypot(width, height) / 2
+            bounds = QRectF(x + width / 2 - radius, y + height / 2 - radius, radius * 2, radius * 2)
+        else:
+            bounds = QRectF(x, y, width, height)
         
-        return points
+        handle_pos = self.get_rotation_handle_position(obstacle)
+        bounds = bounds.united(QRectF(
+            handle_pos.x() - self.rotation_handle_size,
+            handle_pos.y() - self.rotation_handle_size,
+            self.rotation_handle_size * 2,
+            self.rotation_handle_size * 2
+        ))
+        
+        if obstacle.get('expansion_distance', 0) > 0 or obstacle.get('use_directional_expansion', False):
+            try:
+                expanded_data = self._get_expanded_data(obstacle)
+            except Exception:
+                # Can't tell where the collision box is drawn - repaint everything
+                return self.rect()
+            
+            if expanded_data:
+                bounds = bounds.united(self.expanded_bounds(expanded_data))
+        
+        margin = self.DIRTY_MARGIN
+        return bounds.toAlignedRect().adjusted(-margin, -margin, margin, margin)
+    
+    def preview_dirty_rect(self):
+        """Get the widget area the preview shape paints over (empty if there is none)"""
+        if not self.current_preview_shape:
+            return QRect()
+        
+        margin = self.DIRTY_MARGIN
+        return self.current_preview_shape.adjusted(-margin, -margin, margin, margin)
+    
+    def expanded_bounds(self, expanded_data):
+        """Get the bounding rect of expansion data returned by _get_expanded_data"""
+        if isinstance(expanded_data, tuple):
+            # Generalized method: (edge array, arc center array, arc radius)
+            edges, arc_centers, radius = expanded_data
+            points = np.concatenate([edges.reshape(-1, 2), arc_centers - radius, arc_centers + radius])
+            if not len(points):
+                return QRectF()
+            x1, y1 = points.min(axis=0).tolist()
+            x2, y2 = points.max(axis=0).tolist()
+            return QRectF(x1, y1, x2 - x1, y2 - y1)
+        
+        return expanded_data.boundingRect()
+    
+    def calculate_regular_polygon_points(self, cx, cy, radius, num_sides):
+        """Calculate a regular polygon as a QPolygonF"""
+        return QPolygonF(calculate_polygon_points(cx, cy, radius, num_sides))
     
     def check_preview_overlap(self):
         """Check if the current preview shape overlaps with existing obstacles"""
@@ -326,18 +762,14 @@ class Canvas(QWidget):
             'color': self.obstacle_color
         }
         
-        return self.collision_detector.check_overlap(temp_obstacle, self.obstacles)
+        return self.check_obstacle_overlap(temp_obstacle)
     
     def check_move_overlap(self):
         """Check if the selected obstacle overlaps with others at its current position"""
         if not self.selected_obstacle:
             return False
         
-        return self.collision_detector.check_overlap(
-            self.selected_obstacle, 
-            self.obstacles, 
-            exclude=self.selected_obstacle
-        )
+        return self.check_obstacle_overlap(self.selected_obstacle, exclude=self.selected_obstacle)
     
     def create_obstacle(self, shape_type, start_pos, end_pos):
         """Create an obstacle and add it to the list"""
@@ -359,13 +791,13 @@ class Canvas(QWidget):
             'force_convex_hull': False  # NEW - default to concave (preserve shape)
         }
         
-        if self.collision_detector.check_overlap(obstacle, self.obstacles):
+        if self.check_obstacle_overlap(obstacle):
             main_window = self.get_main_window()
             if main_window:
                 main_window.status_bar.showMessage("Cannot create obstacle: Overlaps with existing obstacle", 3000)
             return
         
-        self.obstacles.append(obstacle)
+        self.add_obstacle(obstacle)
         self.update()
     
     def delete_selected_obstacle(self):
@@ -382,7 +814,7 @@ class Canvas(QWidget):
         )
         
         if reply == QMessageBox.Yes:
-            self.obstacles.remove(self.selected_obstacle)
+            self.remove_obstacle(self.selected_obstacle)
             self.selected_obstacle = None
             
             main_window = self.get_main_window()
@@ -392,23 +824,36 @@ class Canvas(QWidget):
             self.update()
     
     def get_main_window(self):
-        """Get reference to main window"""
+        """Get reference to main window (found once, then cached until the canvas is reparented)"""
+        if self._main_window is not None:
+            return self._main_window
+        
+        # Imported here: mainWindow imports this module
         from mainWindow import MainWindow
         widget = self.parent()
         while widget:
             if isinstance(widget, MainWindow):
+                self._main_window = widget
                 return widget
             widget = widget.parent()
         return None
     
+    def changeEvent(self, event):
+        """Forget the cached main window when the canvas moves to another parent"""
+        if event.type() == QEvent.ParentChange:
+            self._main_window = None
+        super().changeEvent(event)
+    
     def snap_position(self, pos):
         """Snap position to grid if enabled"""
         if self.snap_to_grid:
-            x = round(pos.x() / self.grid_size) * self.grid_size
-            y = round(pos.y() / self.grid_size) * self.grid_size
-            return QPoint(x, y)
+            return QPoint(self.snap_value(pos.x()), self.snap_value(pos.y()))
         return pos
     
+    def snap_value(self, value):
+        """Round a coordinate to the nearest grid line"""
+        return round(value / self.grid_size) * self.grid_size
+    
     def calculate_shape_bounds(self, start_pos, end_pos):
         """Calculate bounding box for shape"""
         x1, y1 = start_pos.x(), start_pos.y()
@@ -436,6 +881,7 @@ class Canvas(QWidget):
         
         if reply == QMessageBox.Yes:
             self.obstacles.clear()
+            self._reset_obstacle_index()
             self.selected_obstacle = None
             
             main_window = self.get_main_window()
@@ -459,14 +905,22 @@ class Canvas(QWidget):
             obstacle['expansion_method'] = ObstacleExpander.METHOD_GENERALIZED
             obstacle['force_convex_hull'] = False  # NEW - default to concave (ONLY for custom polygons)
             
+            # Removing duplicate points can still leave crossing edges
+            has_crossings, _ = self.collision_detector.check_polygon_self_intersection(obstacle['points'])
+            if has_crossings:
+                main_window = self.get_main_window()
+                if main_window:
+                    main_window.status_bar.showMessage("Cannot create polygon: Edges cross each other", 3000)
+                return
+            
             # Check for overlaps before adding
-            if self.collision_detector.check_overlap(obstacle, self.obstacles):
+            if self.check_obstacle_overlap(obstacle):
                 main_window = self.get_main_window()
                 if main_window:
                     main_window.status_bar.showMessage("Cannot create polygon: Overlaps with existing obstacle", 3000)
                 return
             
-            self.obstacles.append(obstacle)
+            self.add_obstacle(obstacle)
             self.polygon_editor.cancel_drawing()
             self.is_drawing_polygon = False
             
@@ -482,7 +936,9 @@ class Canvas(QWidget):
     
     def get_obstacle_at_position(self, pos):
         """Check if position is inside any obstacle and return it"""
-        return self.collision_detector.get_obstacle_at_position(pos, self.obstacles)
+        rows = sorted(self._spatial_hash.query_point(pos.x(), pos.y()))
+        
+        return self.collision_detector.get_obstacle_at_position(pos, [self.obstacles[row] for row in rows])
     
     def point_in_obstacle(self, pos, obstacle):
         """Check if a point is inside an obstacle's bounding box"""
@@ -501,8 +957,14 @@ class Canvas(QWidget):
             return False
             
         handle_pos = self.get_rotation_handle_position(obstacle)
-        distance = math.sqrt((pos.x() - handle_pos.x())**2 + (pos.y() - handle_pos.y())**2)
-        return distance <= self.rotation_handle_size
+        dx = pos.x() - handle_pos.x()
+        dy = pos.y() - handle_pos.y()
+        
+        # Cheap box rejection before the squared distance test
+        r = self.rotation_handle_size
+        if dx > r or dx < -r or dy > r or dy < -r:
+            return False
+        return dx * dx + dy * dy <= r * r
     
     def keyPressEvent(self, event):
         """Handle key press events"""
@@ -531,6 +993,15 @@ class Canvas(QWidget):
             if self.is_drawing_polygon:
                 # Points are automatically snapped in PolygonEditor
                 pos = QPointF(event.pos())
+                
+                # Reject a point whose new edges would cross the polygon drawn so far
+                if self.collision_detector.check_new_edge_intersection(
+                        self.polygon_editor.points, self.polygon_editor.snap_point_to_grid(pos)):
+                    main_window = self.get_main_window()
+                    if main_window:
+                        main_window.status_bar.showMessage("Cannot add point: Edges would cross each other", 3000)
+                    return
+                
                 self.polygon_editor.add_point(pos)
                 
                 main_window = self.get_main_window()
@@ -592,6 +1063,8 @@ class Canvas(QWidget):
             self.is_panning = False
             self.setCursor(QCursor(Qt.ArrowCursor))
         elif event.button() == Qt.LeftButton:
+            self.flush_drag_update()
+            
             if self.is_rotating:
                 self.is_rotating = False
                 self.setCursor(QCursor(Qt.ArrowCursor))
@@ -604,6 +1077,7 @@ class Canvas(QWidget):
                 if self.move_has_overlap and self.original_position:
                     self.selected_obstacle['x'] = self.original_position['x']
                     self.selected_obstacle['y'] = self.original_position['y']
+                    self.obstacle_changed(self.selected_obstacle)
                     
                     main_window = self.get_main_window()
                     if main_window:
@@ -665,7 +1139,36 @@ class Canvas(QWidget):
                 h_bar.setValue(h_bar.value() - delta.x())
                 v_bar.setValue(v_bar.value() - delta.y())
         
-        elif self.is_rotating and self.selected_obstacle:
+        elif (self.is_rotating or self.is_moving) and self.selected_obstacle:
+            self.schedule_drag_update(pos)
+        
+        elif self.is_drawing and self.draw_start_pos:
+            self.schedule_drag_update(pos)
+    
+    def schedule_drag_update(self, pos):
+        """Remember the latest drag position and apply it on the next timer tick"""
+        self._pending_pos = pos
+        if not self._drag_timer.isActive():
+            self._drag_timer.start(self.DRAG_UPDATE_INTERVAL)
+    
+    def schedule_repaint(self):
+        """Repaint the whole canvas on the next timer tick, once however often this is called"""
+        if not self._repaint_timer.isActive():
+            self._repaint_timer.start(self.REPAINT_INTERVAL)
+    
+    def flush_drag_update(self):
+        """Apply a pending drag position immediately"""
+        self._drag_timer.stop()
+        self.apply_drag_update()
+    
+    def apply_drag_update(self):
+        """Rotate, move or resize the preview to the pending drag position"""
+        pos = self._pending_pos
+        if pos is None:
+            return
+        self._pending_pos = None
+        
+        if self.is_rotating and self.selected_obstacle:
             # Skip rotation for custom polygons
             if self.selected_obstacle.get('can_rotate', True) == False:
                 return
@@ -679,29 +1182,41 @@ class Canvas(QWidget):
             dy = pos.y() - center_y
             angle = math.degrees(math.atan2(dy, dx))
             
+            # Repaint only the area covered before and after rotating
+            old_rect = self.obstacle_dirty_rect(self.selected_obstacle)
+            
             self.selected_obstacle['rotation'] = angle % 360
+            self.obstacle_changed(self.selected_obstacle)
             
-            self.update()
+            self.update(old_rect.united(self.obstacle_dirty_rect(self.selected_obstacle)))
         
         elif self.is_moving and self.selected_obstacle:
             new_x = pos.x() - self.move_offset.x()
             new_y = pos.y() - self.move_offset.y()
             
             if self.snap_to_grid:
-                new_x = round(new_x / self.grid_size) * self.grid_size
-                new_y = round(new_y / self.grid_size) * self.grid_size
+                new_x = self.snap_value(new_x)
+                new_y = self.snap_value(new_y)
+            
+            # Repaint only where the obstacle was and where it is now
+            old_rect = self.obstacle_dirty_rect(self.selected_obstacle)
             
             self.selected_obstacle['x'] = new_x
             self.selected_obstacle['y'] = new_y
+            self.obstacle_changed(self.selected_obstacle)
             
             self.move_has_overlap = self.check_move_overlap()
             
-            self.update()
+            self.update(old_rect.united(self.obstacle_dirty_rect(self.selected_obstacle)))
         
         elif self.is_drawing and self.draw_start_pos:
             end_pos = self.snap_position(pos) if self.snap_to_grid else pos
+            
+            # Repaint only the old and new preview areas
+            old_rect = self.preview_dirty_rect()
+            
             self.current_preview_shape = self.calculate_shape_bounds(self.draw_start_pos, end_pos)
             
             self.preview_has_overlap = self.check_preview_overlap()
             
-            self.update()
\ No newline at end of file
+            self.update(old_rect.united(self.preview_dirty_rect()))
\ No newline at end of file
@@ -1,8 +1,53 @@
 """Handles obstacle overlap detection and geometry checks"""
 from PyQt5.QtCore import QPointF
-from PyQt5.QtGui import QPolygonF, QPainterPath
 import math
+from functools import lru_cache
 import numpy as np
+from collisionBoxExpansion import ObstacleExpander
+from collision_numba import HAS_NUMBA, new_edge_intersects, sat_gap, self_intersections
+from utils import polygon_from_array
+
+
+def _unit_polygon(sides):
+    """Get the vertices of a regular polygon on the unit circle, first vertex at the top"""
+    angles = -math.pi / 2 + 2 * math.pi * np.arange(sides) / sides
+    return np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+
+# Unit vertices of the built-in regular polygons, scaled per shape instead of recomputing the trig
+_REGULAR_POLYGON_UNIT = {'pentagon': _unit_polygon(5), 'hexagon': _unit_polygon(6)}
+
+
+@lru_cache(maxsize=1024)
+def _local_vertices(obstacle_type, width, height):
+    """Get the unrotated vertices of a built-in shape relative to its top-left corner
+    
+    Args:
+        obstacle_type: 'rectangle', 'triangle', 'pentagon' or 'hexagon' (anything else is a rectangle)
+        width, height: Shape dimensions
+        
+    Returns:
+        Read-only (N, 2) float64 array (shared between callers)
+    """
+    if obstacle_type == 'triangle':
+        vertices = np.array([
+            (width / 2, 0),       # Top center
+            (width, height),      # Bottom right
+            (0, height)           # Bottom left
+        ], dtype=np.float64)
+    elif obstacle_type in _REGULAR_POLYGON_UNIT:
+        radius = min(width, height) / 2
+        vertices = (width / 2, height / 2) + radius * _REGULAR_POLYGON_UNIT[obstacle_type]
+    else:
+        vertices = np.array([
+            (0, 0),
+            (width, 0),
+            (width, height),
+            (0, height)
+        ], dtype=np.float64)
+    
+    vertices.flags.writeable = False
+    return vertices
 
 
 class CollisionDetector:
@@ -22,93 +67,80 @@ class CollisionDetector:
     def get_obstacle_vertices(self, obstacle):
         """Get actual vertices of an obstacle accounting for rotation and shape
         
+        The result is cached on the obstacle until its geometry_key changes,
+        so callers must not modify it.
+        
         Args:
             obstacle: Obstacle dictionary
             
         Returns:
             List of QPointF representing the obstacle's vertices
         """
+        key = self.geometry_key(obstacle)
+        cached = obstacle.get('_vertices_cache')
+        if cached is None or cached[0] != key:
+            cached = (key, self._compute_obstacle_vertices(obstacle))
+            obstacle['_vertices_cache'] = cached
+        return cached[1]
+    
+    def _compute_obstacle_vertices(self, obstacle):
+        """Compute the vertices returned by get_obstacle_vertices"""
+        return [QPointF(vx, vy) for vx, vy in self.compute_vertex_array(obstacle).tolist()]
+    
+    def compute_vertex_array(self, obstacle):
+        """Compute an obstacle's world-space vertices as an (N, 2) float64 array
+        
+        The result is cached on the obstacle as '_world_cache' until its shape,
+        size, position or rotation changes. The rotated shape itself is cached
+        separately as '_local_cache', so moving an obstacle only re-translates it.
+        
+        Args:
+            obstacle: Obstacle dictionary
+            
+        Returns:
+            NumPy array of the rotated and translated vertices
+        """
+        points = obstacle.get('points')
+        sig = (
+            obstacle.get('type', 'rectangle'), obstacle['x'], obstacle['y'],
+            obstacle['width'], obstacle['height'], obstacle.get('rotation', 0),
+            tuple((p.x(), p.y()) for p in points) if points else None
+        )
+        cached = obstacle.get('_world_cache')
+        if cached is None or cached[0] != sig:
+            local_sig = sig[:1] + sig[3:]
+            local = obstacle.get('_local_cache')
+            if local is None or local[0] != local_sig:
+                local = (local_sig, self._rotated_local_vertices(obstacle))
+                obstacle['_local_cache'] = local
+            
+            # Translate to world position
+            cached = (sig, local[1] + (obstacle['x'], obstacle['y']))
+            obstacle['_world_cache'] = cached
+        return cached[1]
+    
+    def _rotated_local_vertices(self, obstacle):
+        """Get an obstacle's vertices rotated about its center, relative to its top-left corner"""
         obstacle_type = obstacle.get('type', 'rectangle')
-        x = obstacle['x']
-        y = obstacle['y']
         width = obstacle['width']
         height = obstacle['height']
         rotation = obstacle.get('rotation', 0)
         
-        # Generate local vertices based on shape
-        if obstacle_type == 'rectangle':
-            local_vertices = [
-                QPointF(0, 0),
-                QPointF(width, 0),
-                QPointF(width, height),
-                QPointF(0, height)
-            ]
-        elif obstacle_type == 'triangle':
-            local_vertices = [
-                QPointF(width / 2, 0),       # Top center
-                QPointF(width, height),      # Bottom right
-                QPointF(0, height)           # Bottom left
-            ]
-        elif obstacle_type == 'pentagon':
-            cx, cy = width / 2, height / 2
-            radius = min(width, height) / 2
-            local_vertices = []
-            for i in range(5):
-                angle = -math.pi / 2 + (2 * math.pi * i / 5)
-                local_vertices.append(QPointF(
-                    cx + radius * math.cos(angle),
-                    cy + radius * math.sin(angle)
-                ))
-        elif obstacle_type == 'hexagon':
-            cx, cy = width / 2, height / 2
-            radius = min(width, height) / 2
-            local_vertices = []
-            for i in range(6):
-                angle = -math.pi / 2 + (2 * math.pi * i / 6)
-                local_vertices.append(QPointF(
-                    cx + radius * math.cos(angle),
-                    cy + radius * math.sin(angle)
-                ))
-        elif obstacle_type == 'custom_polygon' and 'points' in obstacle:
-            # Convert to local coordinates
-            local_vertices = [QPointF(p.x(), p.y()) for p in obstacle['points']]
+        # Local vertices: custom polygons carry their own, built-in shapes are shared
+        if obstacle_type == 'custom_polygon' and 'points' in obstacle:
+            local_vertices = np.array([(p.x(), p.y()) for p in obstacle['points']], dtype=np.float64)
         else:
-            # Default to rectangle
-            local_vertices = [
-                QPointF(0, 0),
-                QPointF(width, 0),
-                QPointF(width, height),
-                QPointF(0, height)
-            ]
-        
-        # Apply rotation if needed
+            local_vertices = _local_vertices(obstacle_type, width, height)
+        
+        # Apply rotation about the center if needed
         if rotation != 0:
-            center = QPointF(width / 2, height / 2)
+            center = np.array([width / 2, height / 2])
             rad = math.radians(rotation)
             cos_r, sin_r = math.cos(rad), math.sin(rad)
-            
-            rotated_vertices = []
-            for v in local_vertices:
-                # Translate to origin
-                vx = v.x() - center.x()
-                vy = v.y() - center.y()
-                
-                # Rotate
-                rx = vx * cos_r - vy * sin_r
-                ry = vx * sin_r + vy * cos_r
-                
-                # Translate back
-                rotated_vertices.append(QPointF(
-                    rx + center.x(),
-                    ry + center.y()
-                ))
-            
-            local_vertices = rotated_vertices
+            rot = np.array([[cos_r, -sin_r], [sin_r, cos_r]])
+            local_vertices = (local_vertices - center) @ rot.T + center
         
-        # Translate to world position
-        world_vertices = [QPointF(v.x() + x, v.y() + y) for v in local_vertices]
-        
-        return world_vertices
+        return local_vertices
     
     def get_expanded_vertices(self, obstacle):
         """Get vertices of the expanded collision box
@@ -117,63 +149,209 @@ class CollisionDetector:
             obstacle: Obstacle dictionary
             
         Returns:
-            List of QPointF representing expanded collision box vertices, or None if no expansion
+            QPolygonF of the expanded collision box vertices, or None if no expansion
         """
+        vertices = self.get_expanded_vertex_array(obstacle)
+        if vertices is None:
+            return None
+        return polygon_from_array(vertices)
+    
+    def get_expanded_vertex_array(self, obstacle):
+        """Get vertices of the expanded collision box as a float array
+        
+        The result is cached on the obstacle until its geometry_key changes,
+        so callers must not modify it.
+        
+        Args:
+            obstacle: Obstacle dictionary
+            
+        Returns:
+            (N, 2) float64 array of expanded collision box vertices, or None if no expansion
+        """
+        key = self.geometry_key(obstacle)
+        cached = obstacle.get('_expanded_cache')
+        if cached is None or cached[0] != key:
+            cached = (key, self._compute_expanded_vertices(obstacle))
+            obstacle['_expanded_cache'] = cached
+        return cached[1]
+    
+    def _compute_expanded_vertices(self, obstacle):
+        """Compute the vertices returned by get_expanded_vertex_array"""
         expansion_dist = obstacle.get('expansion_distance', 0)
         
         if expansion_dist <= 0:
             return None
         
-        # Import here to avoid circular dependency
-        from collisionBoxExpansion import ObstacleExpander
-        
         expander = ObstacleExpander(expansion_distance=expansion_dist)
         method = obstacle.get('expansion_method', ObstacleExpander.METHOD_GENERALIZED)
         
         try:
-            expanded_data = expander.expand_obstacle(obstacle, method=method)
+            raw = expander.expand_obstacle_raw(obstacle, method=method)
             
-            if not expanded_data:
+            if raw is None:
                 return None
+            method, expanded_data = raw
             
             # Handle different expansion methods
             if method == ObstacleExpander.METHOD_GENERALIZED:
                 # For generalized method with arcs, approximate the full collision box
                 edges, arc_centers, radius = expanded_data
                 
-                # Create a polygon that approximates the collision box
-                vertices = []
+                # Sample the arc around each corner, for all corners at once
+                edges = np.asarray(edges, dtype=np.float64)
+                starts = edges[:, 0]
+                ends = edges[:, 1]
+                centers = np.roll(np.asarray(arc_centers, dtype=np.float64), -1, axis=0)
+                next_starts = np.roll(starts, -1, axis=0)
+                
+                angle1 = np.arctan2(ends[:, 1] - centers[:, 1], ends[:, 0] - centers[:, 0])
+                angle2 = np.arctan2(next_starts[:, 1] - centers[:, 1], next_starts[:, 0] - centers[:, 0])
                 
-                for i, edge in enumerate(edges):
-                    vertices.append(edge[0])
-                    
-                    center = arc_centers[(i + 1) % len(arc_centers)]
-                    
-                    edge_end = edge[1]
-                    next_edge_start = edges[(i + 1) % len(edges)][0]
-                    
-                    angle1 = math.atan2(edge_end.y() - center.y(), edge_end.x() - center.x())
-                    angle2 = math.atan2(next_edge_start.y() - center.y(), next_edge_start.x() - center.x())
-                    
-                    num_samples = 5
-                    for j in range(1, num_samples):
-                        t = j / num_samples
-                        angle = angle1 + t * (angle2 - angle1)
-                        arc_point = QPointF(
-                            center.x() + radius * math.cos(angle),
-                            center.y() + radius * math.sin(angle)
-                        )
-                        vertices.append(arc_point)
+                num_samples = 5
+                t = np.arange(1, num_samples) / num_samples
+                angles = angle1[:, np.newaxis] + t * (angle2 - angle1)[:, np.newaxis]
+                arcs = centers[:, np.newaxis, :] + radius * np.stack([np.cos(angles), np.sin(angles)], axis=-1)
                 
-                return vertices
+                # Each edge's start point followed by the arc samples after it
+                vertices = np.concatenate([starts[:, np.newaxis, :], arcs], axis=1).reshape(-1, 2)
             else:
-                # preserve_shape or convex - already a list of QPointF
-                return expanded_data
+                # preserve_shape or convex - already the polygon's vertices
+                vertices = np.asarray(expanded_data, dtype=np.float64)
+            
+            return vertices if len(vertices) else None
                 
         except Exception as e:
             print(f"Error getting expanded vertices: {e}")
             return None
     
+    def get_collision_vertices(self, obstacle):
+        """Get every vertex of the shapes check_overlap tests for an obstacle
+        
+        Args:
+            obstacle: Obstacle dictionary
+            
+        Returns:
+            (N, 2) float64 array of the rotated obstacle's vertices followed by its collision box's, if any
+        """
+        vertices, expanded = self.get_vertex_arrays(obstacle)
+        if expanded is None:
+            return vertices
+        return np.concatenate([vertices, expanded])
+    
+    def get_collision_bounds(self, obstacle, vertices=None):
+        """Get the axis-aligned box containing every shape check_overlap tests for an obstacle
+        
+        Args:
+            obstacle: Obstacle dictionary
+            vertices: Result of get_collision_vertices, if already computed
+            
+        Returns:
+            Tuple (x, y, width, height) covering the rotated obstacle and its collision box
+        """
+        if vertices is None:
+            vertices = self.get_collision_vertices(obstacle)
+        
+        (min_x, min_y), (max_x, max_y) = vertices.min(axis=0), vertices.max(axis=0)
+        return float(min_x), float(min_y), float(max_x - min_x), float(max_y - min_y)
+    
+    def get_collision_obb(self, obstacle, vertices=None):
+        """Get the box aligned with the obstacle's rotation containing every shape check_overlap tests
+        
+        Args:
+            obstacle: Obstacle dictionary
+            vertices: Result of get_collision_vertices, if already computed
+            
+        Returns:
+            NumPy array of shape (4, 2) with the box corners in order
+        """
+        if vertices is None:
+            vertices = self.get_collision_vertices(obstacle)
+        
+        rotation = obstacle.get('rotation', 0)
+        if not obstacle.get('can_rotate', True):
+            rotation = 0
+        
+        # Fit an axis-aligned box in the obstacle's own frame, then rotate it back
+        center = np.array([obstacle['x'] + obstacle['width'] / 2, obstacle['y'] + obstacle['height'] / 2])
+        angle = math.radians(rotation)
+        cos_a, sin_a = math.cos(angle), math.sin(angle)
+        to_world = np.array([[cos_a, -sin_a], [sin_a, cos_a]])
+        
+        local = (vertices - center) @ to_world
+        (min_x, min_y), (max_x, max_y) = local.min(axis=0), local.max(axis=0)
+        corners = np.array([[min_x, min_y], [max_x, min_y], [max_x, max_y], [min_x, max_y]])
+        
+        return corners @ to_world.T + center
+    
+    def geometry_key(self, obstacle):
+        """Get a tuple of every obstacle property its vertices and collision box depend on
+        
+        Args:
+            obstacle: Obstacle dictionary
+            
+        Returns:
+            Hashable tuple that changes whenever the obstacle's geometry does
+        """
+        get = obstacle.get
+        points = get('points')
+        directional = get('directional_expansion')
+        
+        return (
+            get('type'), obstacle['x'], obstacle['y'], obstacle['width'], obstacle['height'],
+            get('rotation', 0), get('can_rotate', True),
+            get('expansion_distance', 0), get('expansion_method'),
+            get('force_convex_hull'), get('use_directional_expansion', False),
+            tuple(sorted(directional.items())) if directional else (),
+            tuple((p.x(), p.y()) for p in points) if points else None
+        )
+    
+    def get_vertex_arrays(self, obstacle):
+        """Get an obstacle's vertices and collision box vertices as float arrays
+        
+        The arrays are cached on the obstacle and rebuilt when geometry_key changes.
+        
+        Args:
+            obstacle: Obstacle dictionary
+            
+        Returns:
+            Tuple (vertices, expanded_vertices) of (N, 2) float64 arrays;
+            expanded_vertices is None if the obstacle has no collision box
+        """
+        cached = self._geometry_cache(obstacle)
+        return cached[1], cached[2]
+    
+    def get_collision_aabb(self, obstacle):
+        """Get the axis-aligned box around an obstacle and its collision box (cached like get_vertex_arrays)
+        
+        Args:
+            obstacle: Obstacle dictionary
+            
+        Returns:
+            Tuple (min_x, min_y, max_x, max_y)
+        """
+        return self._geometry_cache(obstacle)[3]
+    
+    def _geometry_cache(self, obstacle):
+        """Get the (key, vertices, expanded_vertices, aabb) tuple cached on an obstacle, rebuilding it if stale"""
+        key = self.geometry_key(obstacle)
+        cached = obstacle.get('_verts_cache')
+        
+        if cached is None or cached[0] != key:
+            vertices = self.compute_vertex_array(obstacle)
+            
+            expanded = None
+            if obstacle.get('expansion_distance', 0) > 0:
+                expanded = self.get_expanded_vertex_array(obstacle)
+            
+            everything = vertices if expanded is None else np.concatenate([vertices, expanded])
+            (min_x, min_y), (max_x, max_y) = everything.min(axis=0), everything.max(axis=0)
+            aabb = (float(min_x), float(min_y), float(max_x), float(max_y))
+            
+            cached = (key, vertices, expanded, aabb)
+            obstacle['_verts_cache'] = cached
+        
+        return cached
+    
     def check_overlap(self, obstacle, obstacles_list, exclude=None):
         """Check if an obstacle's collision box overlaps with any existing obstacle's collision box
         
@@ -187,85 +365,182 @@ class CollisionDetector:
         Returns:
             True if overlap detected, False otherwise
         """
+        # One cache lookup per obstacle gives both its arrays and its box
+        _, vertices1_original, vertices1_expanded, (min_x1, min_y1, max_x1, max_y1) = self._geometry_cache(obstacle)
+        
+        # No check below looks farther than this
+        gap = max(self.min_spacing, self.COLLISION_BOX_MIN_GAP)
+        
         # Check against all existing obstacles
         for existing in obstacles_list:
             # Skip if this is the excluded obstacle
             if exclude and existing is exclude:
                 continue
             
-            # FIRST CHECK: Original shapes (blue vs blue) - always check this
-            vertices1_original = self.get_obstacle_vertices(obstacle)
-            vertices2_original = self.get_obstacle_vertices(existing)
+            # Skip obstacles whose whole footprint is out of reach
+            _, vertices2_original, vertices2_expanded, (min_x2, min_y2, max_x2, max_y2) = self._geometry_cache(existing)
+            if (max_x1 + gap < min_x2 or max_x2 + gap < min_x1 or
+                    max_y1 + gap < min_y2 or max_y2 + gap < min_y1):
+                continue
             
+            # FIRST CHECK: Original shapes (blue vs blue) - always check this
             if self._check_polygon_overlap(vertices1_original, vertices2_original, spacing=self.min_spacing):
                 return True
             
-            # SECOND CHECK: Collision boxes (gray vs gray) - only if both have expansion
-            expansion1 = obstacle.get('expansion_distance', 0)
-            expansion2 = existing.get('expansion_distance', 0)
+            # Nothing else to compare unless one of them has a collision box
+            if vertices1_expanded is None and vertices2_expanded is None:
+                continue
             
-            # If both obstacles have collision boxes, enforce minimum gap
-            if expansion1 > 0 and expansion2 > 0:
-                vertices1_expanded = self.get_expanded_vertices(obstacle)
-                vertices2_expanded = self.get_expanded_vertices(existing)
-                
-                if vertices1_expanded and vertices2_expanded:
-                    # Check with COLLISION_BOX_MIN_GAP - this creates the invisible space between gray areas
-                    if self._check_polygon_overlap(vertices1_expanded, vertices2_expanded, spacing=self.COLLISION_BOX_MIN_GAP):
-                        return True
+            # SECOND CHECK: Collision boxes (gray vs gray) - only if both have expansion
+            if vertices1_expanded is not None and vertices2_expanded is not None:
+                # Check with COLLISION_BOX_MIN_GAP - this creates the invisible space between gray areas
+                if self._check_polygon_overlap(vertices1_expanded, vertices2_expanded, spacing=self.COLLISION_BOX_MIN_GAP):
+                    return True
             
             # THIRD CHECK: One has collision box, other doesn't
-            if expansion1 > 0:
-                vertices1_expanded = self.get_expanded_vertices(obstacle)
-                if vertices1_expanded and self._check_polygon_overlap(vertices1_expanded, vertices2_original, spacing=self.min_spacing):
+            if vertices1_expanded is not None:
+                if self._check_polygon_overlap(vertices1_expanded, vertices2_original, spacing=self.min_spacing):
                     return True
             
-            if expansion2 > 0:
-                vertices2_expanded = self.get_expanded_vertices(existing)
-                if vertices2_expanded and self._check_polygon_overlap(vertices1_original, vertices2_expanded, spacing=self.min_spacing):
+            if vertices2_expanded is not None:
+                if self._check_polygon_overlap(vertices1_original, vertices2_expanded, spacing=self.min_spacing):
                     return True
         
         return False
     
     def _check_polygon_overlap(self, vertices1, vertices2, spacing=0):
-        """Helper method to check if two polygons overlap with a minimum spacing
+        """Helper method to check if two polygons overlap or come closer than a minimum spacing
         
         Args:
-            vertices1: List of QPointF for first polygon
-            vertices2: List of QPointF for second polygon
-            spacing: Minimum spacing to enforce between polygons (in pixels)
+            vertices1: (N, 2) array of the first polygon's vertices
+            vertices2: (M, 2) array of the second polygon's vertices
+            spacing: Minimum distance to enforce between polygons (in pixels)
             
         Returns:
-            True if polygons overlap or are within spacing distance, False otherwise
+            True if polygons overlap, touch or are closer than spacing, False otherwise
         """
-        polygon1 = QPolygonF(vertices1)
-        path1 = QPainterPath()
-        path1.addPolygon(polygon1)
-        
-        # Apply spacing buffer to first polygon
-        # This creates an invisible buffer around polygon1
-        if spacing > 0:
-            rect1 = polygon1.boundingRect()
-            # Expand the bounding rect by spacing amount
-            rect1.adjust(-spacing, -spacing, spacing, spacing)
-            path1_expanded = QPainterPath()
-            path1_expanded.addRect(rect1)
+        # AABB fast path: boxes farther apart than spacing on either axis settle it
+        if ((vertices1.max(axis=0) + spacing < vertices2.min(axis=0)).any() or
+                (vertices2.max(axis=0) + spacing < vertices1.min(axis=0)).any()):
+            return False
+        
+        if self._is_convex(vertices1) and self._is_convex(vertices2):
+            # Separating axis test over both polygons' edge normals
+            gap = self._sat_gap(vertices1, vertices2)
+            if gap > spacing:
+                return False
+            if gap <= 0:
+                return True
         else:
-            path1_expanded = path1
+            # Concave shapes: the boundaries cross or one polygon is inside the other
+            if (self._edges_cross(vertices1, vertices2) or
+                    self._point_in_polygon(vertices1[0], vertices2) or
+                    self._point_in_polygon(vertices2[0], vertices1)):
+                return True
+        
+        # The polygons are disjoint: compare their actual distance with the spacing (both squared)
+        distance_sq = self._polygon_distance_sq(vertices1, vertices2)
+        return distance_sq < spacing * spacing or distance_sq == 0
+    
+    @staticmethod
+    def _is_convex(vertices):
+        """Check if a polygon is convex (all turns the same way, winding once)"""
+        edges = np.roll(vertices, -1, axis=0) - vertices
+        next_edges = np.roll(edges, -1, axis=0)
         
-        polygon2 = QPolygonF(vertices2)
-        path2 = QPainterPath()
-        path2.addPolygon(polygon2)
+        cross = edges[:, 0] * next_edges[:, 1] - edges[:, 1] * next_edges[:, 0]
+        dot = (edges * next_edges).sum(axis=1)
         
-        # Check for intersection
-        # If the expanded polygon1 intersects polygon2, they're too close
-        return path1_expanded.intersects(path2) or path2.intersects(path1_expanded)
+        turning = cross[np.abs(cross) > 1e-9]
+        if len(turning) and not ((turning > 0).all() or (turning < 0).all()):
+            return False
+        
+        # A star shape turns the same way at every vertex but winds more than once
+        return abs(np.arctan2(cross, dot).sum()) < 2 * math.pi + 1e-6
+    
+    @staticmethod
+    def _sat_gap(vertices1, vertices2):
+        """Get the largest separation between two convex polygons along their edge normals
+        
+        Returns:
+            Positive gap if a separating axis exists, otherwise zero or the (negative) smallest penetration
+        """
+        if HAS_NUMBA:
+            return sat_gap(vertices1, vertices2)
+        
+        edges = np.concatenate([
+            np.roll(vertices1, -1, axis=0) - vertices1,
+            np.roll(vertices2, -1, axis=0) - vertices2
+        ])
+        lengths = np.hypot(edges[:, 0], edges[:, 1])
+        edges = edges[lengths > 1e-9]
+        lengths = lengths[lengths > 1e-9]
+        normals = np.stack([-edges[:, 1], edges[:, 0]], axis=1) / lengths[:, np.newaxis]
+        
+        projections1 = vertices1 @ normals.T
+        projections2 = vertices2 @ normals.T
+        
+        gaps = np.maximum(projections2.min(axis=0) - projections1.max(axis=0),
+                          projections1.min(axis=0) - projections2.max(axis=0))
+        return gaps.max()
+    
+    @staticmethod
+    def _edges_cross(vertices1, vertices2):
+        """Check if any edge of one polygon properly crosses any edge of the other"""
+        a0 = vertices1[:, np.newaxis, :]
+        a1 = np.roll(vertices1, -1, axis=0)[:, np.newaxis, :]
+        b0 = vertices2[np.newaxis, :, :]
+        b1 = np.roll(vertices2, -1, axis=0)[np.newaxis, :, :]
+        
+        def cross(o, p, q):
+            return (p[..., 0] - o[..., 0]) * (q[..., 1] - o[..., 1]) - (p[..., 1] - o[..., 1]) * (q[..., 0] - o[..., 0])
+        
+        d1 = cross(b0, b1, a0)
+        d2 = cross(b0, b1, a1)
+        d3 = cross(a0, a1, b0)
+        d4 = cross(a0, a1, b1)
+        
+        return bool(((d1 * d2 < 0) & (d3 * d4 < 0)).any())
+    
+    @staticmethod
+    def _point_in_polygon(point, vertices):
+        """Check if a point lies inside a polygon (even-odd rule)"""
+        x, y = point
+        x0, y0 = vertices[:, 0], vertices[:, 1]
+        x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+        
+        straddles = (y0 > y) != (y1 > y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing_x = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+        
+        return bool(np.count_nonzero(straddles & (x < crossing_x)) % 2)
+    
+    @staticmethod
+    def _polygon_distance_sq(vertices1, vertices2):
+        """Get the squared distance between the boundaries of two polygons that don't cross"""
+        def vertex_to_edges(points, polygon):
+            starts = polygon
+            edges = np.roll(polygon, -1, axis=0) - polygon
+            lengths2 = (edges * edges).sum(axis=1)
+            lengths2[lengths2 == 0] = 1
+            
+            offsets = points[:, np.newaxis, :] - starts[np.newaxis, :, :]
+            t = np.clip((offsets * edges).sum(axis=2) / lengths2, 0, 1)
+            closest = offsets - t[..., np.newaxis] * edges
+            return (closest * closest).sum(axis=2).min()
+        
+        return min(vertex_to_edges(vertices1, vertices2), vertex_to_edges(vertices2, vertices1))
     
     def point_in_obstacle(self, pos, obstacle):
         """Check if a point is inside an obstacle using actual polygon shape"""
-        vertices = self.get_obstacle_vertices(obstacle)
-        polygon = QPolygonF(vertices)
-        return polygon.containsPoint(pos, 1)  # 1 = Qt.OddEvenFill
+        x, y = pos.x(), pos.y()
+        
+        # Cheap rejection against the cached box before the crossing test
+        min_x, min_y, max_x, max_y = self.get_collision_aabb(obstacle)
+        if x < min_x or x > max_x or y < min_y or y > max_y:
+            return False
+        
+        return self._point_in_polygon((x, y), self.get_vertex_arrays(obstacle)[0])
     
     def get_obstacle_at_position(self, pos, obstacles_list):
         """Check if position is inside any obstacle and return it"""
@@ -278,7 +553,7 @@ class CollisionDetector:
     def segments_intersect(self, p1, p2, p3, p4):
         """Check if line segment p1-p2 intersects with line segment p3-p4"""
         def orientation(p, q, r):
-            val = (q.y() - p.y()) * (r.x() - q.x()) - (q.x() - p.x()) * (r.y() - p.y())
+            val = (q.y() - p.y()) * (r.x() - q.x()) - (q.x() - p.x()) * (r.y() - q.y())
             if val == 0:
                 return 0
             return 1 if val > 0 else 2
@@ -309,54 +584,122 @@ class CollisionDetector:
         return False
     
     def check_polygon_self_intersection(self, points):
-        """Check if a polygon has self-intersecting edges"""
+        """Check if a polygon has self-intersecting edges
+        
+        Args:
+            points: List of QPointF polygon vertices
+            
+        Returns:
+            Tuple (has_crossings, crossing_indices) where crossing_indices lists the
+            (i, j) pairs of non-adjacent edges that intersect; edge i runs from point i to i + 1
+        """
         if len(points) < 3:
             return False, []
         
-        crossing_indices = []
         n = len(points)
+        vertices = np.array([(p.x(), p.y()) for p in points], dtype=np.float64)
         
-        for i in range(n):
-            for j in range(i + 2, n):
-                if j == n - 1 and i == 0:
-                    continue
-                
-                p1 = points[i]
-                p2 = points[(i + 1) % n]
-                p3 = points[j]
-                p4 = points[(j + 1) % n]
-                
-                if self.segments_intersect(p1, p2, p3, p4):
-                    crossing_indices.append((i, j))
+        if HAS_NUMBA:
+            crossing_indices = [(int(a), int(b)) for a, b in self_intersections(vertices)]
+            return len(crossing_indices) > 0, crossing_indices
+        
+        starts = vertices
+        ends = np.roll(vertices, -1, axis=0)
+        
+        # Every pair of non-adjacent edges (the first and last edge share a point)
+        i, j = np.triu_indices(n, k=2)
+        keep = ~((i == 0) & (j == n - 1))
+        
+        # Edges whose boxes don't touch can't intersect, which rules out most pairs
+        lo = np.minimum(starts, ends)
+        hi = np.maximum(starts, ends)
+        keep &= ~((hi[i, 0] < lo[j, 0]) | (hi[j, 0] < lo[i, 0]) |
+                  (hi[i, 1] < lo[j, 1]) | (hi[j, 1] < lo[i, 1]))
+        i, j = i[keep], j[keep]
+
+        hits = self._segments_intersect_many(starts[i], ends[i], starts[j], ends[j])
+        crossing_indices = [(int(a), int(b)) for a, b in zip(i[hits], j[hits])]
         
         return len(crossing_indices) > 0, crossing_indices
     
+    @staticmethod
+    def _segments_intersect_many(p1, p2, p3, p4):
+        """Vectorized segments_intersect over (K, 2) arrays of segment endpoints
+        
+        Returns:
+            Boolean array of shape (K,), True where segment p1-p2 intersects segment p3-p4
+        """
+        def orientation(p, q, r):
+            return np.sign((q[:, 1] - p[:, 1]) * (r[:, 0] - q[:, 0]) - (q[:, 0] - p[:, 0]) * (r[:, 1] - q[:, 1]))
+        
+        def on_segment(p, q, r):
+            return ((q[:, 0] <= np.maximum(p[:, 0], r[:, 0])) & (q[:, 0] >= np.minimum(p[:, 0], r[:, 0])) &
+                    (q[:, 1] <= np.maximum(p[:, 1], r[:, 1])) & (q[:, 1] >= np.minimum(p[:, 1], r[:, 1])))
+        
+        o1 = orientation(p1, p2, p3)
+        o2 = orientation(p1, p2, p4)
+        o3 = orientation(p3, p4, p1)
+        o4 = orientation(p3, p4, p2)
+        
+        return (((o1 != o2) & (o3 != o4)) |
+                ((o1 == 0) & on_segment(p1, p3, p2)) |
+                ((o2 == 0) & on_segment(p1, p4, p2)) |
+                ((o3 == 0) & on_segment(p3, p1, p4)) |
+                ((o4 == 0) & on_segment(p3, p2, p4)))
+    
     def check_new_edge_intersection(self, existing_points, new_point):
-        """Check if adding a new point would create crossing edges"""
+        """Check if adding a new point would create crossing edges
+        
+        Tests the edge from the last point to the new one, and the closing edge from
+        the new point back to the first, against the existing edges they don't share
+        an endpoint with. The edges they do share an endpoint with only count when the
+        new edge doubles back along them (collinear and overlapping past the shared point).
+        
+        Args:
+            existing_points: List of QPointF of the open polyline
+            new_point: QPointF to be appended
+            
+        Returns:
+            True if either new edge crosses an existing edge
+        """
         if len(existing_points) < 2:
             return False
         
-        last_point = existing_points[-1]
+        vertices = np.array([(p.x(), p.y()) for p in existing_points], dtype=np.float64)
         
-        for i in range(len(existing_points) - 1):
-            edge_start = existing_points[i]
-            edge_end = existing_points[i + 1]
-            
-            if self.segments_intersect(last_point, new_point, edge_start, edge_end):
-                return True
+        if HAS_NUMBA:
+            return bool(new_edge_intersects(vertices, float(new_point.x()), float(new_point.y())))
         
-        if len(existing_points) >= 2:
-            first_point = existing_points[0]
-            
-            for i in range(1, len(existing_points) - 1):
-                edge_start = existing_points[i]
-                edge_end = existing_points[i + 1]
-                
-                if self.segments_intersect(new_point, first_point, edge_start, edge_end):
-                    return True
+        n = len(vertices)
+        new = np.array([new_point.x(), new_point.y()], dtype=np.float64)
         
-        return False
-
+        # last -> new against the last edge, new -> first against the first edge
+        if self._folds_back(vertices[-1], vertices[-2], new) or self._folds_back(vertices[0], vertices[1], new):
+            return True
+        
+        # Edges 0 .. n-3 against last -> new, edges 1 .. n-2 against new -> first
+        edges = np.concatenate([np.arange(n - 2), np.arange(1, n - 1)])
+        p1 = np.repeat([vertices[-1], new], n - 2, axis=0)
+        p2 = np.repeat([new, vertices[0]], n - 2, axis=0)
+        p3, p4 = vertices[edges], vertices[edges + 1]
+        
+        # Edges whose boxes don't touch can't intersect
+        near = ~((np.maximum(p1, p2) < np.minimum(p3, p4)).any(axis=1) |
+                 (np.maximum(p3, p4) < np.minimum(p1, p2)).any(axis=1))
+        
+        return bool(self._segments_intersect_many(p1[near], p2[near], p3[near], p4[near]).any())
+    
+    @staticmethod
+    def _folds_back(shared, other, new):
+        """Check if the segment shared -> new runs back along the segment shared -> other
+        
+        Two segments meeting at a point only overlap beyond it when they are collinear
+        and leave it in the same direction.
+        """
+        a = other - shared
+        b = new - shared
+        return a[0] * b[1] - a[1] * b[0] == 0 and a[0] * b[0] + a[1] * b[1] > 0
+    
     def expand_polygon_generalized(self, vertices):
         vertices = np.array(vertices)
         n = len(vertices)
@@ -2,7 +2,7 @@
 import math
 from PyQt5.QtCore import Qt, QPoint
 from PyQt5.QtGui import QCursor
-from utils import calculate_distance
+from utils import calculate_distance_sq
 
 
 class MouseHandler:
@@ -12,14 +12,17 @@ class MouseHandler:
         self.canvas = canvas
         self.rotation_handle_size = 10
         self.resize_handle_size = 8
+        
+        # Squared handle radii, compared with squared distances to skip the sqrt
+        self._rotation_handle_r2 = self.rotation_handle_size ** 2
+        self._resize_handle_r2 = self.resize_handle_size ** 2
     
     def is_on_rotation_handle(self, pos, obstacle):
         """Check if a point is on the rotation handle"""
         x = obstacle['x'] + obstacle['width']
         y = obstacle['y']
         handle_pos = QPoint(int(x), int(y))
-        distance = calculate_distance(pos, handle_pos)
-        return distance <= self.rotation_handle_size
+        return calculate_distance_sq(pos, handle_pos) <= self._rotation_handle_r2
     
     def get_resize_handles(self, obstacle):
         """Get positions of all resize handles"""
@@ -40,8 +43,7 @@ class MouseHandler:
         handles = self.get_resize_handles(obstacle)
         
         for handle_name, handle_pos in handles.items():
-            distance = calculate_distance(pos, handle_pos)
-            if distance <= self.resize_handle_size:
+            if calculate_distance_sq(pos, handle_pos) <= self._resize_handle_r2:
                 return handle_name
         return None
     
@@ -18,6 +18,14 @@ class PolygonEditor:
         self.preview_point = None  # Current mouse position for preview
         self.grid_size = grid_size  # Grid size for snapping
         
+        # Pens and brushes reused on every preview draw
+        self._pen_edge = QPen(QColor(100, 150, 200), 2, Qt.SolidLine)
+        self._pen_closing_edge = QPen(QColor(100, 150, 200), 2, Qt.DashLine)
+        self._pen_preview_line = QPen(QColor(100, 150, 200), 1, Qt.DashLine)
+        self._pen_snap_indicator = QPen(QColor(150, 150, 150), 1, Qt.DotLine)
+        self._brush_vertex = QBrush(QColor(255, 100, 100))
+        self._brush_first_vertex = QBrush(QColor(0, 255, 0))
+        
     def start_drawing(self):
         """Start a new polygon drawing session"""
         self.points = []
@@ -33,8 +41,10 @@ class PolygonEditor:
         Returns:
             QPointF: Snapped point
         """
-        x = round(point.x() / self.grid_size) * self.grid_size
-        y = round(point.y() / self.grid_size) * self.grid_size
+        # Same rounding as Canvas.snap_value, so polygon points and dragged obstacles agree
+        grid = self.grid_size
+        x = round(point.x() / grid) * grid
+        y = round(point.y() / grid) * grid
         return QPointF(x, y)
         
     def add_point(self, point):
@@ -94,22 +104,21 @@ class PolygonEditor:
         
         cleaned = [points[0]]
         tolerance = self.grid_size / 2  # Use half grid size as tolerance
+        tolerance_sq = tolerance * tolerance  # Compared with squared distances
         
         for i in range(1, len(points)):
             # Calculate distance from last added point
             dx = points[i].x() - cleaned[-1].x()
             dy = points[i].y() - cleaned[-1].y()
-            distance = (dx * dx + dy * dy) ** 0.5
             
-            if distance > tolerance:
+            if dx * dx + dy * dy > tolerance_sq:
                 cleaned.append(points[i])
         
         # Check if last point is too close to first point
         if len(cleaned) > 1:
             dx = cleaned[-1].x() - cleaned[0].x()
             dy = cleaned[-1].y() - cleaned[0].y()
-            distance = (dx * dx + dy * dy) ** 0.5
-            if distance < tolerance:
+            if dx * dx + dy * dy < tolerance_sq:
                 cleaned.pop()
         
         return cleaned
@@ -175,22 +184,19 @@ class PolygonEditor:
             return
         
         # Draw edges between existing points (STRAIGHT LINES)
-        pen = QPen(QColor(100, 150, 200), 2, Qt.SolidLine)
-        painter.setPen(pen)
+        painter.setPen(self._pen_edge)
         
         for i in range(len(self.points) - 1):
             painter.drawLine(self.points[i], self.points[i + 1])
         
         # Draw closing edge if we have enough points
         if len(self.points) >= 3:
-            pen.setStyle(Qt.DashLine)
-            painter.setPen(pen)
+            painter.setPen(self._pen_closing_edge)
             painter.drawLine(self.points[-1], self.points[0])
         
         # Draw preview line from last point to current mouse position
         if self.preview_point and len(self.points) > 0:
-            pen = QPen(QColor(100, 150, 200), 1, Qt.DashLine)
-            painter.setPen(pen)
+            painter.setPen(self._pen_preview_line)
             painter.drawLine(self.points[-1], self.preview_point)
             
             # If we have 2+ points, also show closing preview
@@ -199,19 +205,19 @@ class PolygonEditor:
         
         # Draw vertex points
         painter.setPen(Qt.NoPen)
-        painter.setBrush(QBrush(QColor(255, 100, 100)))
+        painter.setBrush(self._brush_vertex)
         
         for point in self.points:
             painter.drawEllipse(point, 4, 4)
         
         # Draw first point larger to indicate start
         if len(self.points) > 0:
-            painter.setBrush(QBrush(QColor(0, 255, 0)))
+            painter.setBrush(self._brush_first_vertex)
             painter.drawEllipse(self.points[0], 6, 6)
         
         # Draw grid snap indicator at preview point
         if self.preview_point:
-            painter.setPen(QPen(QColor(150, 150, 150), 1, Qt.DotLine))
+            painter.setPen(self._pen_snap_indicator)
             painter.setBrush(Qt.NoBrush)
             painter.drawEllipse(self.preview_point, 8, 8)
     
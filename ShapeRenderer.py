@@ -1,18 +1,64 @@
 """Handles rendering of all shapes and obstacles"""
-from PyQt5.QtCore import Qt, QPoint
-from PyQt5.QtGui import QPainter, QPen, QColor, QBrush, QPolygonF
-from utils import calculate_polygon_points
+import math
+from PyQt5.QtCore import Qt, QPoint, QPointF, QLineF, QRectF
+from PyQt5.QtGui import QPainter, QPen, QColor, QBrush, QPolygonF, QPixmap
 
 
 class ShapeRenderer:
     """Renders obstacles and shapes on the canvas"""
     
+    # Unit-radius vertices of the regular polygon shapes, first vertex at the top
+    _unit_polygons = {
+        n: tuple((math.cos(2 * math.pi * i / n - math.pi / 2), math.sin(2 * math.pi * i / n - math.pi / 2))
+                 for i in range(n))
+        for n in (5, 6)
+    }
+    
+    # Extra pixels around an obstacle's bounds its outline may paint (pen width + antialiasing)
+    CLIP_MARGIN = 4
+    
     def __init__(self):
         self.rotation_handle_size = 10
         self.resize_handle_size = 8
+        
+        # Pens and brushes built once and reused for every draw
+        self._pen_normal = QPen(QColor(50, 50, 50), 2)
+        self._pen_selected = QPen(QColor(255, 200, 0), 4)
+        self._pen_invalid = QPen(QColor(255, 0, 0), 2, Qt.DashLine)
+        self._brush_invalid = QBrush(QColor(255, 0, 0, 30))
+        self._preview_pen = QPen(QColor(), 2, Qt.DashLine)  # color set per draw
+        self._brush_cache = {}  # (color.rgba(), alpha) -> QBrush
+        self._pen_rotation = QPen(QColor(255, 0, 0), 2)
+        self._brush_rotation = QBrush(QColor(255, 100, 100))
+        self._pen_resize = QPen(QColor(0, 100, 255), 2)
+        self._brush_resize = QBrush(QColor(100, 150, 255))
+        
+        # One polygon per side count, overwritten in place on each draw
+        self._scratch_polys = {n: QPolygonF([QPointF()] * n) for n in self._unit_polygons}
+        
+        self._pen_grid = QPen(QColor(200, 200, 200), 1)
+        
+        # Shape type -> method drawing its outline, called as (painter, x, y, width, height, obstacle)
+        self._shape_drawers = {
+            'rectangle': self._draw_rectangle,
+            'circle': self._draw_circle,
+            'triangle': self._draw_triangle,
+            'pentagon': self._draw_pentagon,
+            'hexagon': self._draw_hexagon,
+            'custom_polygon': self._draw_custom_polygon,
+        }
+        self._grid_pixmap = None  # grid pre-rendered for _grid_key
+        self._grid_key = None  # (width, height, grid_size)
     
-    def draw_single_obstacle(self, painter, obstacle, preview=False, selected=False, invalid=False):
-        """Draw a single obstacle shape"""
+    def draw_single_obstacle(self, painter, obstacle, preview=False, selected=False, invalid=False, clip_rect=None):
+        """Draw a single obstacle shape
+        
+        Args:
+            painter: QPainter object to draw with
+            obstacle: Obstacle dictionary
+            preview, selected, invalid: Drawing style flags
+            clip_rect: Exposed QRect/QRectF (e.g. QPaintEvent.rect()); obstacles outside it are skipped
+        """
         shape_type = obstacle['type']
         x = obstacle['x']
         y = obstacle['y']
@@ -20,12 +66,22 @@ class ShapeRenderer:
         height = obstacle['height']
         color = obstacle['color']
         rotation = obstacle.get('rotation', 0)
+        rotated = self._is_rotated(rotation)
         
-        # Save painter state
-        painter.save()
+        if clip_rect is not None:
+            if rotated:
+                # A rotated shape always stays inside the circle around its center
+                radius = math.hypot(width, height) / 2
+                bounds = QRectF(x + width / 2 - radius, y + height / 2 - radius, radius * 2, radius * 2)
+            else:
+                bounds = QRectF(x, y, width, height)
+            margin = self.CLIP_MARGIN
+            if not QRectF(clip_rect).intersects(bounds.adjusted(-margin, -margin, margin, margin)):
+                return
         
-        # Apply rotation if needed
-        if rotation != 0:
+        # Apply rotation if needed; only then is there painter state to restore
+        if rotated:
+            painter.save()
             center_x = x + width / 2
             center_y = y + height / 2
             painter.translate(center_x, center_y)
@@ -34,104 +90,156 @@ class ShapeRenderer:
         
         # Set up painter
         if invalid:
-            pen = QPen(QColor(255, 0, 0), 2, Qt.DashLine)
-            brush = QBrush(QColor(255, 0, 0, 30))
+            pen = self._pen_invalid
+            brush = self._brush_invalid
         elif preview:
-            pen = QPen(color, 2, Qt.DashLine)
-            brush = QBrush(QColor(color.red(), color.green(), color.blue(), 50))
+            pen = self._preview_pen
+            pen.setColor(color)
+            brush = self._get_brush(color, alpha=50)
         elif selected:
-            pen = QPen(QColor(255, 200, 0), 4)
-            brush = QBrush(color)
+            pen = self._pen_selected
+            brush = self._get_brush(color)
         else:
-            pen = QPen(QColor(50, 50, 50), 2)
-            brush = QBrush(color)
+            pen = self._pen_normal
+            brush = self._get_brush(color)
         
         painter.setPen(pen)
         painter.setBrush(brush)
         
         # Draw based on shape type
-        if shape_type == 'rectangle':
-            painter.drawRect(x, y, width, height)
-        elif shape_type == 'circle':
-            painter.drawEllipse(x, y, width, height)
-        elif shape_type == 'triangle':
-            points = [
-                QPoint(x + width // 2, y),
-                QPoint(x, y + height),
-                QPoint(x + width, y + height)
-            ]
-            painter.drawPolygon(QPolygonF(points))
-        elif shape_type == 'pentagon':
-            cx = x + width // 2
-            cy = y + height // 2
-            radius = min(width, height) // 2
-            points = calculate_polygon_points(cx, cy, radius, 5)
-            painter.drawPolygon(QPolygonF(points))
-        elif shape_type == 'hexagon':
-            cx = x + width // 2
-            cy = y + height // 2
-            radius = min(width, height) // 2
-            points = calculate_polygon_points(cx, cy, radius, 6)
-            painter.drawPolygon(QPolygonF(points))
-        elif shape_type == 'custom_polygon':
-            absolute_points = [QPoint(x + p.x(), y + p.y()) for p in obstacle['points']]
-            painter.drawPolygon(QPolygonF(absolute_points))
-        
-        painter.restore()
+        drawer = self._shape_drawers.get(shape_type)
+        if drawer is not None:
+            drawer(painter, x, y, width, height, obstacle)
+        
+        if rotated:
+            painter.restore()
+    
+    def _draw_rectangle(self, painter, x, y, width, height, obstacle):
+        painter.drawRect(QRectF(x, y, width, height))
+    
+    def _draw_circle(self, painter, x, y, width, height, obstacle):
+        painter.drawEllipse(QRectF(x, y, width, height))
+    
+    def _draw_triangle(self, painter, x, y, width, height, obstacle):
+        points = [
+            QPointF(x + width * 0.5, y),
+            QPointF(x, y + height),
+            QPointF(x + width, y + height)
+        ]
+        painter.drawPolygon(QPolygonF(points))
+    
+    def _draw_pentagon(self, painter, x, y, width, height, obstacle):
+        painter.drawPolygon(self._regular_polygon(x + width * 0.5, y + height * 0.5, min(width, height) * 0.5, 5))
+    
+    def _draw_hexagon(self, painter, x, y, width, height, obstacle):
+        painter.drawPolygon(self._regular_polygon(x + width * 0.5, y + height * 0.5, min(width, height) * 0.5, 6))
+    
+    def _draw_custom_polygon(self, painter, x, y, width, height, obstacle):
+        painter.drawPolygon(self._custom_polygon(obstacle))
+    
+    @staticmethod
+    def _is_rotated(rotation):
+        """Check if a rotation in degrees visibly differs from none (360, -0.0 and drift don't)"""
+        rotation %= 360.0
+        return 0.01 < rotation < 359.99
+    
+    def _custom_polygon(self, obstacle):
+        """Get a custom polygon's absolute outline, cached on the obstacle until it moves or its points change"""
+        points = obstacle['points']
+        key = (obstacle['x'], obstacle['y'], id(points), len(points))
+        if obstacle.get('_poly_key') != key:
+            x, y = obstacle['x'], obstacle['y']
+            obstacle['_poly'] = QPolygonF(points).translated(x, y)
+            obstacle['_poly_key'] = key
+        return obstacle['_poly']
+    
+    def _regular_polygon(self, cx, cy, radius, sides):
+        """Scale and translate the unit template for a regular polygon into its scratch QPolygonF"""
+        polygon = self._scratch_polys[sides]
+        for i, (c, s) in enumerate(self._unit_polygons[sides]):
+            polygon.replace(i, QPointF(cx + radius * c, cy + radius * s))
+        return polygon
+    
+    def _get_brush(self, color, alpha=None):
+        """Get a shared solid brush for a color, optionally with its alpha replaced
+        
+        Args:
+            color: QColor to fill with
+            alpha: Alpha (0-255) to use instead of the color's own, or None
+            
+        Returns:
+            Cached QBrush
+        """
+        key = (color.rgba(), alpha)
+        brush = self._brush_cache.get(key)
+        if brush is None:
+            fill = QColor(color)
+            if alpha is not None:
+                fill.setAlpha(alpha)
+            brush = self._brush_cache[key] = QBrush(fill)
+        return brush
     
     def draw_rotation_handle(self, painter, obstacle):
         """Draw rotation handle for selected obstacle"""
-        x = obstacle['x'] + obstacle['width']
-        y = obstacle['y']
-        handle_pos = QPoint(int(x), int(y))
-        
-        painter.setPen(QPen(QColor(255, 0, 0), 2))
-        painter.setBrush(QBrush(QColor(255, 100, 100)))
-        painter.drawEllipse(
-            handle_pos.x() - self.rotation_handle_size,
-            handle_pos.y() - self.rotation_handle_size,
-            self.rotation_handle_size * 2,
-            self.rotation_handle_size * 2
-        )
+        painter.setPen(self._pen_rotation)
+        painter.setBrush(self._brush_rotation)
+        painter.drawEllipse(self._rotation_handle_rect(obstacle))
     
     def draw_resize_handles(self, painter, obstacle):
         """Draw resize handles (four corners) for selected obstacle"""
+        self._draw_resize_rects(painter, self._resize_handle_rects(obstacle))
+    
+    def _rotation_handle_rect(self, obstacle):
+        """Get the bounding rect of an obstacle's rotation handle circle"""
+        size = self.rotation_handle_size
+        return QRectF(obstacle['x'] + obstacle['width'] - size, obstacle['y'] - size, size * 2, size * 2)
+    
+    def _resize_handle_rects(self, obstacle):
+        """Get the squares of an obstacle's four corner resize handles"""
         x = obstacle['x']
         y = obstacle['y']
-        width = obstacle['width']
-        height = obstacle['height']
-        
-        handles = {
-            'tl': QPoint(int(x), int(y)),
-            'tr': QPoint(int(x + width), int(y)),
-            'bl': QPoint(int(x), int(y + height)),
-            'br': QPoint(int(x + width), int(y + height))
-        }
-        
-        painter.setPen(QPen(QColor(0, 100, 255), 2))
-        painter.setBrush(QBrush(QColor(100, 150, 255)))
+        right = x + obstacle['width']
+        bottom = y + obstacle['height']
+        size = self.resize_handle_size
+        return [QRectF(hx - size, hy - size, size * 2, size * 2)
+                for hx, hy in ((x, y), (right, y), (x, bottom), (right, bottom))]
+    
+    def _draw_resize_rects(self, painter, rects):
+        """Draw resize handle squares in one call"""
+        painter.setPen(self._pen_resize)
+        painter.setBrush(self._brush_resize)
         
-        for handle_pos in handles.values():
-            painter.drawRect(
-                handle_pos.x() - self.resize_handle_size,
-                handle_pos.y() - self.resize_handle_size,
-                self.resize_handle_size * 2,
-                self.resize_handle_size * 2
-            )
+        # Axis-aligned squares gain nothing from antialiasing
+        antialiased = painter.testRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        painter.drawRects(rects)
+        painter.setRenderHint(QPainter.Antialiasing, antialiased)
     
     def draw_grid(self, painter, width, height, grid_size):
-        """Draw the grid lines"""
-        pen = QPen(QColor(200, 200, 200), 1)
-        painter.setPen(pen)
+        """Draw the grid lines (rendered once into a pixmap, then blitted)"""
+        key = (width, height, grid_size)
+        if self._grid_pixmap is None or self._grid_key != key:
+            self._grid_pixmap = self._build_grid_pixmap(width, height, grid_size)
+            self._grid_key = key
+        
+        painter.drawPixmap(0, 0, self._grid_pixmap)
+    
+    def invalidate_grid(self):
+        """Drop the pre-rendered grid, e.g. after the canvas is resized or the grid size changes"""
+        self._grid_pixmap = None
+        self._grid_key = None
+    
+    def _build_grid_pixmap(self, width, height, grid_size):
+        """Render the grid lines onto a transparent pixmap"""
+        pixmap = QPixmap(width + 1, height + 1)
+        pixmap.fill(Qt.transparent)
+        
+        lines = [QLineF(x, 0, x, height) for x in range(0, width + 1, grid_size)]
+        lines += [QLineF(0, y, width, y) for y in range(0, height + 1, grid_size)]
+        
+        painter = QPainter(pixmap)
+        painter.setPen(self._pen_grid)
+        painter.drawLines(lines)
+        painter.end()
         
-        # Draw vertical lines
-        x = 0
-        while x <= width:
-            painter.drawLine(x, 0, x, height)
-            x += grid_size
-        
-        # Draw horizontal lines
-        y = 0
-        while y <= height:
-            painter.drawLine(0, y, width, y)
-            y += grid_size
\ No newline at end of file
+        return pixmap
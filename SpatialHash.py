@@ -0,0 +1,82 @@
+"""Uniform grid index for looking up items by position"""
+from collections import defaultdict
+
+
+class SpatialHash:
+    """Buckets items into square grid cells by their bounding boxes"""
+    
+    def __init__(self, cell_size=128):
+        """Initialize an empty index
+        
+        Args:
+            cell_size: Width and height of a grid cell in pixels (default: 128)
+        """
+        self.cell_size = cell_size
+        self._cells = defaultdict(set)  # (cell_x, cell_y) -> set of keys
+        self._item_cells = {}  # key -> cells it was inserted into
+    
+    def cells_for_box(self, x1, y1, x2, y2):
+        """Get every cell overlapped by a box given by its corners
+        
+        Args:
+            x1, y1: Top-left corner
+            x2, y2: Bottom-right corner
+        
+        Returns:
+            List of (cell_x, cell_y) tuples
+        """
+        cell = self.cell_size
+        return [
+            (cx, cy)
+            for cx in range(int(x1 // cell), int(x2 // cell) + 1)
+            for cy in range(int(y1 // cell), int(y2 // cell) + 1)
+        ]
+    
+    def insert(self, key, x1, y1, x2, y2):
+        """Add an item to every cell its box overlaps
+        
+        Args:
+            key: Hashable item identifier
+            x1, y1, x2, y2: Corners of the item's bounding box
+        """
+        cells = self.cells_for_box(x1, y1, x2, y2)
+        for cell in cells:
+            self._cells[cell].add(key)
+        self._item_cells[key] = cells
+    
+    def remove(self, key):
+        """Remove an item from the cells it was inserted into (no-op if absent)"""
+        for cell in self._item_cells.pop(key, ()):
+            bucket = self._cells[cell]
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+    
+    def update(self, key, x1, y1, x2, y2):
+        """Move an item to the cells of its new bounding box"""
+        self.remove(key)
+        self.insert(key, x1, y1, x2, y2)
+    
+    def clear(self):
+        """Remove every item"""
+        self._cells = defaultdict(set)
+        self._item_cells = {}
+    
+    def query(self, x1, y1, x2, y2):
+        """Get the keys of items sharing at least one cell with a box
+        
+        Args:
+            x1, y1, x2, y2: Corners of the query box
+        
+        Returns:
+            Set of keys (a superset of the items whose boxes actually overlap it)
+        """
+        keys = set()
+        for cell in self.cells_for_box(x1, y1, x2, y2):
+            keys.update(self._cells.get(cell, ()))
+        return keys
+    
+    def query_point(self, x, y):
+        """Get the keys of items registered in the cell containing a point"""
+        cell = (int(x // self.cell_size), int(y // self.cell_size))
+        return set(self._cells.get(cell, ()))
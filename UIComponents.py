@@ -7,6 +7,25 @@ from PyQt5.QtGui import QFont, QIntValidator, QDoubleValidator
 from collisionBoxExpansion import ObstacleExpander
 
 
+# Shared stylesheet of the small directional "Apply" buttons
+_APPLY_BTN_QSS = """
+    QPushButton {
+        background-color: #337ab7;
+        color: white;
+        font-size: 9px;
+        padding: 3px;
+        border-radius: 3px;
+    }
+    QPushButton:hover {
+        background-color: #286090;
+    }
+    QPushButton:disabled {
+        background-color: #cccccc;
+        color: #666666;
+    }
+"""
+
+
 class UIComponents:
     """Builds UI components for the main window"""
     
@@ -81,6 +100,34 @@ class UIComponents:
         
         return toolbar, shape_button_group, finish_polygon_btn, snap_grid_btn
     
+    @staticmethod
+    def _make_directional_row(direction, tooltip, directional_expansion_callback):
+        """Build one directional expansion row: an input and its Apply button
+        
+        Returns:
+            Tuple (container, input, apply_button)
+        """
+        container = QWidget()
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(5)
+        container.setLayout(layout)
+        
+        direction_input = QLineEdit()
+        direction_input.setPlaceholderText("0")
+        direction_input.setValidator(QDoubleValidator(0.0, 500.0, 1))
+        direction_input.setToolTip(tooltip)
+        layout.addWidget(direction_input)
+        
+        apply_btn = QPushButton("Apply")
+        apply_btn.setFixedWidth(50)
+        apply_btn.setStyleSheet(_APPLY_BTN_QSS)
+        apply_btn.setEnabled(False)
+        apply_btn.clicked.connect(lambda: directional_expansion_callback(direction, direction_input.text()))
+        layout.addWidget(apply_btn)
+        
+        return container, direction_input, apply_btn
+    
     @staticmethod
     def create_properties_panel(property_change_callback, delete_callback, add_collision_box_callback, toggle_convex_callback, directional_expansion_callback):
         """Create the side panel for obstacle properties"""
@@ -89,6 +136,10 @@ class UIComponents:
         side_panel.setFixedWidth(300)
         side_panel.setStyleSheet("QFrame { background-color: #f0f0f0; }")
         
+        # Hold off repaints while the ~25 child widgets are added; they are polished
+        # once, when updates are turned back on below
+        side_panel.setUpdatesEnabled(False)
+        
         side_layout = QVBoxLayout()
         side_layout.setContentsMargins(10, 10, 10, 10)
         side_panel.setLayout(side_layout)
@@ -190,153 +241,24 @@ class UIComponents:
         directional_layout.setContentsMargins(0, 0, 0, 0)
         directional_grid.setLayout(directional_layout)
         
-        # North expansion with apply button
-        north_container = QWidget()
-        north_layout = QHBoxLayout()
-        north_layout.setContentsMargins(0, 0, 0, 0)
-        north_layout.setSpacing(5)
-        north_container.setLayout(north_layout)
-        
-        expansion_north_input = QLineEdit()
-        expansion_north_input.setPlaceholderText("0")
-        expansion_north_input.setValidator(QDoubleValidator(0.0, 500.0, 1))
-        expansion_north_input.setToolTip("Expand collision box northward (upward)")
-        north_layout.addWidget(expansion_north_input)
-        
-        apply_north_btn = QPushButton("Apply")
-        apply_north_btn.setFixedWidth(50)
-        apply_north_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #337ab7;
-                color: white;
-                font-size: 9px;
-                padding: 3px;
-                border-radius: 3px;
-            }
-            QPushButton:hover {
-                background-color: #286090;
-            }
-            QPushButton:disabled {
-                background-color: #cccccc;
-                color: #666666;
-            }
-        """)
-        apply_north_btn.setEnabled(False)
-        apply_north_btn.clicked.connect(lambda: directional_expansion_callback('north', expansion_north_input.text()))
-        north_layout.addWidget(apply_north_btn)
-        
-        directional_layout.addRow("North (px):", north_container)
-        
-        # South expansion with apply button
-        south_container = QWidget()
-        south_layout = QHBoxLayout()
-        south_layout.setContentsMargins(0, 0, 0, 0)
-        south_layout.setSpacing(5)
-        south_container.setLayout(south_layout)
-        
-        expansion_south_input = QLineEdit()
-        expansion_south_input.setPlaceholderText("0")
-        expansion_south_input.setValidator(QDoubleValidator(0.0, 500.0, 1))
-        expansion_south_input.setToolTip("Expand collision box southward (downward)")
-        south_layout.addWidget(expansion_south_input)
-        
-        apply_south_btn = QPushButton("Apply")
-        apply_south_btn.setFixedWidth(50)
-        apply_south_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #337ab7;
-                color: white;
-                font-size: 9px;
-                padding: 3px;
-                border-radius: 3px;
-            }
-            QPushButton:hover {
-                background-color: #286090;
-            }
-            QPushButton:disabled {
-                background-color: #cccccc;
-                color: #666666;
-            }
-        """)
-        apply_south_btn.setEnabled(False)
-        apply_south_btn.clicked.connect(lambda: directional_expansion_callback('south', expansion_south_input.text()))
-        south_layout.addWidget(apply_south_btn)
-        
-        directional_layout.addRow("South (px):", south_container)
-        
-        # East expansion with apply button
-        east_container = QWidget()
-        east_layout = QHBoxLayout()
-        east_layout.setContentsMargins(0, 0, 0, 0)
-        east_layout.setSpacing(5)
-        east_container.setLayout(east_layout)
-        
-        expansion_east_input = QLineEdit()
-        expansion_east_input.setPlaceholderText("0")
-        expansion_east_input.setValidator(QDoubleValidator(0.0, 500.0, 1))
-        expansion_east_input.setToolTip("Expand collision box eastward (rightward)")
-        east_layout.addWidget(expansion_east_input)
-        
-        apply_east_btn = QPushButton("Apply")
-        apply_east_btn.setFixedWidth(50)
-        apply_east_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #337ab7;
-                color: white;
-                font-size: 9px;
-                padding: 3px;
-                border-radius: 3px;
-            }
-            QPushButton:hover {
-                background-color: #286090;
-            }
-            QPushButton:disabled {
-                background-color: #cccccc;
-                color: #666666;
-            }
-        """)
-        apply_east_btn.setEnabled(False)
-        apply_east_btn.clicked.connect(lambda: directional_expansion_callback('east', expansion_east_input.text()))
-        east_layout.addWidget(apply_east_btn)
-        
-        directional_layout.addRow("East (px):", east_container)
-        
-        # West expansion with apply button
-        west_container = QWidget()
-        west_layout = QHBoxLayout()
-        west_layout.setContentsMargins(0, 0, 0, 0)
-        west_layout.setSpacing(5)
-        west_container.setLayout(west_layout)
-        
-        expansion_west_input = QLineEdit()
-        expansion_west_input.setPlaceholderText("0")
-        expansion_west_input.setValidator(QDoubleValidator(0.0, 500.0, 1))
-        expansion_west_input.setToolTip("Expand collision box westward (leftward)")
-        west_layout.addWidget(expansion_west_input)
-        
-        apply_west_btn = QPushButton("Apply")
-        apply_west_btn.setFixedWidth(50)
-        apply_west_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #337ab7;
-                color: white;
-                font-size: 9px;
-                padding: 3px;
-                border-radius: 3px;
-            }
-            QPushButton:hover {
-                background-color: #286090;
-            }
-            QPushButton:disabled {
-                background-color: #cccccc;
-                color: #666666;
-            }
-        """)
-        apply_west_btn.setEnabled(False)
-        apply_west_btn.clicked.connect(lambda: directional_expansion_callback('west', expansion_west_input.text()))
-        west_layout.addWidget(apply_west_btn)
-        
-        directional_layout.addRow("West (px):", west_container)
+        # N/S/E/W expansion inputs, each with its own apply button. Only basic shapes use
+        # them, so they are built the first time the caller needs them
+        def build_directional_rows():
+            """Add the N/S/E/W rows to the directional grid
+            
+            Returns:
+                Dict mapping 'north', 'south', 'east' and 'west' to (input, apply_button)
+            """
+            directional_rows = {}
+            for direction, tooltip in (('north', "Expand collision box northward (upward)"),
+                                       ('south', "Expand collision box southward (downward)"),
+                                       ('east', "Expand collision box eastward (rightward)"),
+                                       ('west', "Expand collision box westward (leftward)")):
+                container, direction_input, apply_btn = UIComponents._make_directional_row(
+                    direction, tooltip, directional_expansion_callback)
+                directional_layout.addRow(f"{direction.capitalize()} (px):", container)
+                directional_rows[direction] = (direction_input, apply_btn)
+            return directional_rows
         
         properties_layout.addRow(directional_grid)
         
@@ -447,10 +369,11 @@ class UIComponents:
         info_label.setWordWrap(True)
         side_layout.addWidget(info_label)
         
-        # Return statement - added directional apply buttons
+        side_panel.setUpdatesEnabled(True)
+        side_panel.ensurePolished()
+        
+        # Return statement - directional rows come from build_directional_rows()
         return (side_panel, type_label, pos_x_input, pos_y_input, width_input, 
                 height_input, rotation_input, expansion_distance_input, expansion_method_combo, 
                 add_collision_box_btn, delete_btn, convex_hull_toggle,
-                expansion_north_input, expansion_south_input, expansion_east_input, expansion_west_input,
-                directional_grid, directional_expansion_label,
-                apply_north_btn, apply_south_btn, apply_east_btn, apply_west_btn)
\ No newline at end of file
+                directional_grid, directional_expansion_label, build_directional_rows)
\ No newline at end of file
@@ -6,6 +6,9 @@ import numpy as np
 import math
 from PyQt5.QtCore import QPointF
 from scipy.spatial import ConvexHull
+from utils import polygon_from_array
+from collision_numba import (HAS_NUMBA, expand_convex, expand_convex_batch, expand_preserve,
+                             expand_preserve_batch, offset_edges, offset_edges_batch)
 
 
 class ObstacleExpander:
@@ -20,6 +23,20 @@ class ObstacleExpander:
     METHOD_CONVEX = 'convex'
     METHOD_GENERALIZED = 'generalized'
     
+    # Polygons with up to this many vertices are hulled in Python rather than with scipy's Qhull
+    MONOTONE_HULL_MAX_POINTS = 128
+    
+    # Unit-circle vertices of regular polygons by number of sides, filled on first use
+    _UNIT_POLYGONS = {}
+    
+    # Rectangle and triangle vertices in a unit box, scaled by (width, height)
+    _UNIT_RECTANGLE = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]])
+    _UNIT_TRIANGLE = np.array([
+        [0.5, 0.0],  # Top center
+        [1.0, 1.0],  # Bottom right
+        [0.0, 1.0]   # Bottom left
+    ])
+    
     def __init__(self, expansion_distance=0, force_convex_hull=False):
         """
         Args:
@@ -30,6 +47,21 @@ class ObstacleExpander:
         """
         self.d_exp = expansion_distance
         self.force_convex_hull = force_convex_hull
+        
+        # Reused (n, 2) output buffers for the local vertices of regular polygons, by number of sides
+        self._polygon_scratch = {}
+        
+        # Method -> implementation, resolved once instead of branching on every expansion
+        self._polygon_methods = {
+            self.METHOD_PRESERVE_SHAPE: self.expand_polygon_preserve_shape,
+            self.METHOD_CONVEX: self.expand_polygon_convex,
+            self.METHOD_GENERALIZED: self.expand_polygon_generalized
+        }
+        self._directional_methods = {
+            self.METHOD_PRESERVE_SHAPE: self._directional_preserve_shape,
+            self.METHOD_CONVEX: self._directional_convex,
+            self.METHOD_GENERALIZED: self._directional_generalized
+        }
     
     @staticmethod
     def get_expansion_method_name(method):
@@ -87,26 +119,75 @@ class ObstacleExpander:
             force_convex_hull: Optional override for convex hull forcing. If None, uses class setting
         
         Returns:
-            For preserve_shape/convex: List of QPointF representing expanded polygon vertices
+            For preserve_shape/convex: QPolygonF of the expanded polygon vertices
             For generalized: Tuple of (edges, arc_centers, arc_radius)
             For directional: depends on shape and method
             Returns None if expansion_distance is 0
         """
-        # Check for directional expansion (basic shapes) - UPDATED to support all shapes
-        if obstacle.get('use_directional_expansion', False):
-            directional_exp = obstacle.get('directional_expansion', {})
-            exp_north = directional_exp.get('north', 0)
-            exp_south = directional_exp.get('south', 0)
-            exp_east = directional_exp.get('east', 0)
-            exp_west = directional_exp.get('west', 0)
+        raw = self.expand_obstacle_raw(obstacle, method, force_convex_hull)
+        if raw is None:
+            return None
+        return self._to_qt_result(*raw)
+    
+    def expand_obstacle_raw(self, obstacle, method=None, force_convex_hull=None):
+        """
+        Expand an obstacle like expand_obstacle, but without creating any Qt objects.
+        
+        Args:
+            obstacle: Obstacle dictionary with keys: type, x, y, width, height, rotation
+            method: Optional override for expansion method. If None, uses obstacle's method
+            force_convex_hull: Optional override for convex hull forcing. If None, uses class setting
+        
+        Returns:
+            Tuple (method, expanded) where method is the method actually used and expanded is
+            an (N, 2) float64 array for preserve_shape/convex, or a tuple of
+            ((N, 2, 2) edges, (N, 2) arc centers, arc radius) for generalized.
+            Returns None if there is nothing to expand.
+            The result is cached on the obstacle (see _expansion_key), so callers must not modify it.
+        """
+        key = self._expansion_key(obstacle, method, force_convex_hull)
+        cached = obstacle.get('_expansion_cache')
+        if cached is None or cached[0] != key:
+            cached = obstacle['_expansion_cache'] = (key, self._compute_expansion_raw(obstacle, method, force_convex_hull))
+        return cached[1]
+    
+    def _expansion_key(self, obstacle, method, force_convex_hull):
+        """
+        Get a tuple of everything expand_obstacle_raw's result depends on.
+        
+        Args:
+            obstacle: Obstacle dictionary
+            method: Method override passed to expand_obstacle_raw
+            force_convex_hull: Convex hull override passed to expand_obstacle_raw
             
-            # If any directional expansion is set, use directional method
-            if exp_north > 0 or exp_south > 0 or exp_east > 0 or exp_west > 0:
-                obstacle_type = obstacle.get('type')
-                if obstacle_type == 'rectangle':
-                    return self.expand_rectangle_directional(obstacle)
-                elif obstacle_type in ['triangle', 'pentagon', 'hexagon']:
-                    return self.expand_polygon_directional(obstacle)
+        Returns:
+            Hashable tuple that changes whenever the expansion would
+        """
+        get = obstacle.get
+        points = get('points')
+        directional = get('directional_expansion')
+        
+        use_convex_hull = force_convex_hull if force_convex_hull is not None else self.force_convex_hull
+        
+        return (
+            get('type'), obstacle['x'], obstacle['y'], obstacle['width'], obstacle['height'],
+            get('rotation', 0), get('can_rotate', True),
+            tuple((p.x(), p.y()) for p in points) if points else None,
+            get('expansion_distance', self.d_exp), method or get('expansion_method', self.METHOD_GENERALIZED),
+            get('force_convex_hull', use_convex_hull), get('use_directional_expansion', False),
+            tuple(sorted(directional.items())) if directional else ()
+        )
+    
+    def _compute_expansion_raw(self, obstacle, method, force_convex_hull):
+        """Compute the result expand_obstacle_raw caches"""
+        # Check for directional expansion (basic shapes) - UPDATED to support all shapes
+        # If any directional expansion is set, use directional method
+        if self._is_directional_active(obstacle):
+            obstacle_type = obstacle.get('type')
+            if obstacle_type == 'rectangle':
+                return self._expand_rectangle_directional_raw(obstacle)
+            elif obstacle_type in ['triangle', 'pentagon', 'hexagon']:
+                return self._expand_polygon_directional_raw(obstacle)
         
         # Original expansion logic continues...
         # Get expansion distance from obstacle or use class default
@@ -116,10 +197,6 @@ class ObstacleExpander:
         if expansion_dist <= 0:
             return None
         
-        # Temporarily set expansion distance
-        old_distance = self.d_exp
-        self.d_exp = expansion_dist
-        
         # Determine if we should force convex hull
         use_convex_hull = force_convex_hull if force_convex_hull is not None else self.force_convex_hull
         # Also check obstacle's own setting
@@ -130,6 +207,15 @@ class ObstacleExpander:
         if method is None:
             method = obstacle.get('expansion_method', self.METHOD_GENERALIZED)
         
+        # Axis-aligned rectangles have closed-form expansions
+        if (not use_convex_hull and obstacle.get('type') == 'rectangle' and obstacle.get('rotation', 0) == 0
+                and obstacle['width'] > 0 and obstacle['height'] > 0 and method in self.get_all_methods()):
+            return self._expand_axis_aligned_rectangle(obstacle, method, expansion_dist)
+        
+        # Temporarily set expansion distance
+        old_distance = self.d_exp
+        self.d_exp = expansion_dist
+        
         try:
             # Convert obstacle to vertices
             vertices = self._obstacle_to_vertices(obstacle)
@@ -138,26 +224,100 @@ class ObstacleExpander:
             if use_convex_hull:
                 vertices = self._compute_convex_hull(vertices)
             
-            # Expand the polygon
-            if method == self.METHOD_PRESERVE_SHAPE:
-                expanded = self.expand_polygon_preserve_shape(vertices)
-                result = [QPointF(v[0], v[1]) for v in expanded]
-            elif method == self.METHOD_CONVEX:
-                expanded = self.expand_polygon_convex(vertices)
-                result = [QPointF(v[0], v[1]) for v in expanded]
-            elif method == self.METHOD_GENERALIZED:
-                edges, centers, radius = self.expand_polygon_generalized(vertices)
-                # Convert to QPointF for Qt compatibility
-                qt_edges = [[QPointF(e[0][0], e[0][1]), QPointF(e[1][0], e[1][1])] for e in edges]
-                qt_centers = [QPointF(c[0], c[1]) for c in centers]
-                result = (qt_edges, qt_centers, radius)
-            else:
+            # Expand the polygon (vertices and their hull are both CCW already)
+            expand = self._polygon_methods.get(method)
+            if expand is None:
                 raise ValueError(f"Unknown method: {method}")
+            expanded = expand(vertices, ccw=True)
         finally:
             # Restore original distance
             self.d_exp = old_distance
         
-        return result
+        return method, expanded
+    
+    def _expand_axis_aligned_rectangle(self, obstacle, method, distance):
+        """
+        Expand an unrotated rectangle without going through the polygon pipeline.
+        
+        Gives the same points as expand_polygon_* on the rectangle's vertices,
+        built straight from x, y, width, height and the expansion distance.
+        
+        Args:
+            obstacle: Rectangle obstacle dictionary with rotation 0
+            method: METHOD_PRESERVE_SHAPE, METHOD_CONVEX or METHOD_GENERALIZED
+            distance: Expansion distance
+            
+        Returns:
+            Same format as expand_obstacle_raw
+        """
+        left = obstacle['x']
+        top = obstacle['y']
+        right = left + obstacle['width']
+        bottom = top + obstacle['height']
+        
+        if method == self.METHOD_PRESERVE_SHAPE:
+            # Corners of the grown rectangle, starting at the top-right one
+            return method, np.array([
+                (right + distance, top - distance),
+                (right + distance, bottom + distance),
+                (left - distance, bottom + distance),
+                (left - distance, top - distance)
+            ], dtype=np.float64)
+        
+        if method == self.METHOD_CONVEX:
+            # Two points per corner, one on each adjacent pushed-out edge
+            return method, np.array([
+                (left - distance, top), (left, top - distance),
+                (right, top - distance), (right + distance, top),
+                (right + distance, bottom), (right, bottom + distance),
+                (left, bottom + distance), (left - distance, bottom)
+            ], dtype=np.float64)
+        
+        # Generalized: pushed-out edges (top, right, bottom, left) with arcs at the corners
+        edges = np.array([
+            [(left, top - distance), (right, top - distance)],
+            [(right + distance, top), (right + distance, bottom)],
+            [(right, bottom + distance), (left, bottom + distance)],
+            [(left - distance, bottom), (left - distance, top)]
+        ], dtype=np.float64)
+        arc_centers = np.array([(left, top), (right, top), (right, bottom), (left, bottom)], dtype=np.float64)
+        return method, (edges, arc_centers, distance)
+    
+    @staticmethod
+    def _is_directional_active(obstacle):
+        """
+        Check whether an obstacle uses directional expansion with at least one non-zero side.
+        
+        Args:
+            obstacle: Obstacle dictionary
+            
+        Returns:
+            True if the directional expansion methods apply
+        """
+        if not obstacle.get('use_directional_expansion', False):
+            return False
+        directional_exp = obstacle.get('directional_expansion', {})
+        return any(directional_exp.get(side, 0) > 0 for side in ('north', 'south', 'east', 'west'))
+    
+    def _to_qt_result(self, method, expanded):
+        """
+        Convert the output of an expand_polygon_* method to the format expand_obstacle returns.
+        
+        Args:
+            method: Method constant the expansion was made with
+            expanded: Vertices (preserve_shape/convex) or (edges, arc_centers, arc_radius) (generalized)
+            
+        Returns:
+            QPolygonF, or tuple of (edges as QPointF pairs, arc centers as QPointF, arc radius)
+        """
+        if method == self.METHOD_GENERALIZED:
+            edges, centers, radius = expanded
+            # Convert to QPointF for Qt compatibility
+            qt_edges = [[QPointF(x1, y1), QPointF(x2, y2)]
+                        for (x1, y1), (x2, y2) in np.asarray(edges, dtype=np.float64).tolist()]
+            qt_centers = [QPointF(x, y) for x, y in np.asarray(centers, dtype=np.float64).tolist()]
+            return (qt_edges, qt_centers, radius)
+        return polygon_from_array(expanded)
     
     def _compute_convex_hull(self, vertices):
         """
@@ -174,6 +334,14 @@ class ObstacleExpander:
         if len(vertices) < 3:
             return vertices
         
+        # Small polygons (all the editor makes) are cheaper to hull in Python than via Qhull
+        if len(vertices) <= self.MONOTONE_HULL_MAX_POINTS:
+            hull_vertices = self._convex_hull_monotone(vertices)
+            if len(hull_vertices) < 3:
+                print("Warning: Convex hull computation failed: all points are collinear")
+                return vertices
+            return hull_vertices
+        
         try:
             # Compute convex hull using scipy
             hull = ConvexHull(vertices)
@@ -189,9 +357,75 @@ class ObstacleExpander:
             # Return original vertices if hull computation fails
             return vertices
     
+    @staticmethod
+    def _convex_hull_monotone(vertices):
+        """
+        Compute the convex hull of points with Andrew's monotone chain algorithm.
+        Collinear points on the hull boundary are dropped, as Qhull does.
+        
+        Args:
+            vertices: numpy array of shape (n, 2) of points
+            
+        Returns:
+            numpy array of hull vertices in counter-clockwise order
+            (fewer than 3 rows if the points are collinear)
+        """
+        order = np.lexsort((vertices[:, 1], vertices[:, 0]))
+        points = vertices[order].tolist()
+        
+        def build(chain, point):
+            # Pop the last point while it doesn't make a left turn towards the new one
+            while len(chain) >= 2:
+                (ox, oy), (ax, ay) = chain[-2], chain[-1]
+                if (ax - ox) * (point[1] - oy) - (ay - oy) * (point[0] - ox) > 0:
+                    break
+                chain.pop()
+            chain.append(point)
+        
+        lower = []
+        for point in points:
+            build(lower, point)
+        upper = []
+        for point in reversed(points):
+            build(upper, point)
+        
+        # The last point of each chain is the first of the other
+        return np.array(lower[:-1] + upper[:-1], dtype=float).reshape(-1, 2)
+    
     def _obstacle_to_vertices(self, obstacle):
         """
         Convert obstacle dictionary to numpy array of vertices.
+        
+        The vertices are returned in counter-clockwise order as a contiguous float64
+        array, ready for the expand_polygon_* methods. The result is cached on the
+        obstacle as '_expander_vertices' together with the properties it was computed
+        from, and only recomputed when one of them changes. The cached array is read-only.
+        
+        Args:
+            obstacle: Obstacle dictionary
+            
+        Returns:
+            numpy array of shape (n, 2) representing polygon vertices
+        """
+        get = obstacle.get
+        points = get('points')
+        key = (
+            get('type', 'rectangle'), obstacle['x'], obstacle['y'], obstacle['width'], obstacle['height'],
+            get('rotation', 0), get('can_rotate', True),
+            tuple((p.x(), p.y()) for p in points) if points else None
+        )
+        
+        cached = get('_expander_vertices')
+        if cached is None or cached[0] != key:
+            vertices = self._ensure_counter_clockwise(self._compute_obstacle_vertices(obstacle))
+            vertices = np.ascontiguousarray(vertices, dtype=np.float64)
+            vertices.setflags(write=False)
+            cached = obstacle['_expander_vertices'] = (key, vertices)
+        return cached[1]
+    
+    def _compute_obstacle_vertices(self, obstacle):
+        """
+        Convert obstacle dictionary to numpy array of vertices.
         Handles rotation and different obstacle types.
         
         Args:
@@ -209,37 +443,19 @@ class ObstacleExpander:
         
         # Generate local vertices based on shape
         if obstacle_type == 'rectangle':
-            local_vertices = np.array([
-                [0, 0],
-                [width, 0],
-                [width, height],
-                [0, height]
-            ])
+            local_vertices = self._UNIT_RECTANGLE * (width, height)
         elif obstacle_type == 'triangle':
-            local_vertices = np.array([
-                [width / 2, 0],       # Top center
-                [width, height],      # Bottom right
-                [0, height]           # Bottom left
-            ])
+            local_vertices = self._UNIT_TRIANGLE * (width, height)
         elif obstacle_type == 'pentagon':
-            cx, cy = width / 2, height / 2
-            radius = min(width, height) / 2
-            local_vertices = self._regular_polygon_vertices(cx, cy, radius, 5)
+            local_vertices = self._local_polygon_vertices(width, height, 5)
         elif obstacle_type == 'hexagon':
-            cx, cy = width / 2, height / 2
-            radius = min(width, height) / 2
-            local_vertices = self._regular_polygon_vertices(cx, cy, radius, 6)
+            local_vertices = self._local_polygon_vertices(width, height, 6)
         elif obstacle_type == 'custom_polygon' and 'points' in obstacle:
             # Convert QPointF to numpy array (points are already in local coordinates)
             local_vertices = np.array([[p.x(), p.y()] for p in obstacle['points']])
         else:
             # Default to rectangle
-            local_vertices = np.array([
-                [0, 0],
-                [width, 0],
-                [width, height],
-                [0, height]
-            ])
+            local_vertices = self._UNIT_RECTANGLE * (width, height)
         
         # Apply rotation if needed (skip for custom polygons as they don't rotate)
         can_rotate = obstacle.get('can_rotate', True)
@@ -252,29 +468,77 @@ class ObstacleExpander:
                 # For regular shapes, use bounding box center
                 center = np.array([width / 2, height / 2])
             
-            rad = math.radians(rotation)
-            cos_r, sin_r = math.cos(rad), math.sin(rad)
-            rotation_matrix = np.array([
-                [cos_r, -sin_r],
-                [sin_r, cos_r]
-            ])
-            
             # Rotate around center
-            local_vertices = (local_vertices - center) @ rotation_matrix.T + center
+            local_vertices = self._rotate_about(local_vertices, center, rotation)
         
         # Translate to world position
         world_vertices = local_vertices + np.array([x, y])
         
         return world_vertices
     
-    def _regular_polygon_vertices(self, cx, cy, radius, num_sides):
-        """Generate vertices for a regular polygon"""
-        angles = np.linspace(-np.pi/2, 2*np.pi - np.pi/2, num_sides, endpoint=False)
-        vertices = np.column_stack([
-            cx + radius * np.cos(angles),
-            cy + radius * np.sin(angles)
-        ])
-        return vertices
+    @staticmethod
+    def _rotate_about(vertices, center, rotation):
+        """
+        Rotate vertices around a center point.
+        
+        The points are treated as complex numbers, so the rotation is a single
+        elementwise multiply instead of a matrix product.
+        
+        Args:
+            vertices: numpy array of shape (n, 2)
+            center: (x, y) of the rotation center
+            rotation: Angle in degrees
+            
+        Returns:
+            numpy array of shape (n, 2) with the rotated vertices
+        """
+        rad = math.radians(rotation)
+        turn = complex(math.cos(rad), math.sin(rad))
+        pivot = complex(center[0], center[1])
+        z = (vertices[:, 0] + 1j * vertices[:, 1] - pivot) * turn + pivot
+        return np.column_stack([z.real, z.imag])
+    
+    def _regular_polygon_vertices(self, cx, cy, radius, num_sides, out=None):
+        """Generate vertices for a regular polygon
+        
+        Args:
+            cx, cy: Center of the polygon
+            radius: Distance from the center to each vertex
+            num_sides: Number of sides
+            out: Optional (num_sides, 2) float array to write the vertices into
+            
+        Returns:
+            (num_sides, 2) array of vertices (out itself when given)
+        """
+        unit = self._UNIT_POLYGONS.get(num_sides)
+        if unit is None:
+            if num_sides % 2 == 0:
+                # Even polygons are point-symmetric: the second half is the first one negated
+                angles = np.linspace(-np.pi/2, np.pi/2, num_sides // 2, endpoint=False)
+                half = np.column_stack([np.cos(angles), np.sin(angles)])
+                unit = np.concatenate([half, -half])
+            else:
+                angles = np.linspace(-np.pi/2, 2*np.pi - np.pi/2, num_sides, endpoint=False)
+                unit = np.column_stack([np.cos(angles), np.sin(angles)])
+            self._UNIT_POLYGONS[num_sides] = unit
+        
+        if out is None:
+            return (cx, cy) + radius * unit
+        np.multiply(unit, radius, out=out)
+        out += (cx, cy)
+        return out
+    
+    def _local_polygon_vertices(self, width, height, num_sides):
+        """
+        Get the local vertices of a regular polygon inscribed in a width x height box.
+        
+        The vertices are written into a buffer reused on every call, so callers must
+        be done with them before the next call with the same number of sides.
+        """
+        out = self._polygon_scratch.get(num_sides)
+        if out is None:
+            out = self._polygon_scratch[num_sides] = np.empty((num_sides, 2))
+        return self._regular_polygon_vertices(width / 2, height / 2, min(width, height) / 2, num_sides, out=out)
     
     def _is_counter_clockwise(self, vertices):
         """
@@ -294,18 +558,14 @@ class ObstacleExpander:
             bool: True if counter-clockwise, False if clockwise
         """
         # Shoelace formula: sum of (x[i] * y[i+1] - x[i+1] * y[i])
-        n = len(vertices)
-        signed_area = 0.0
-        
-        for i in range(n):
-            x1, y1 = vertices[i]
-            x2, y2 = vertices[(i + 1) % n]
-            signed_area += (x1 * y2 - x2 * y1)
+        vertices = np.asarray(vertices)
+        following = self._next_rows(vertices)
+        signed_area = np.sum(vertices[:, 0] * following[:, 1] - following[:, 0] * vertices[:, 1])
         
         # If signed_area > 0: counter-clockwise
         # If signed_area < 0: clockwise
         # If signed_area == 0: degenerate (collinear points)
-        return signed_area > 0
+        return bool(signed_area > 0)
     
     def _ensure_counter_clockwise(self, vertices):
         """
@@ -322,61 +582,53 @@ class ObstacleExpander:
             return vertices[::-1]  # Reverse order
         return vertices
     
-    def expand_polygon_preserve_shape(self, vertices):
+    def expand_polygon_preserve_shape(self, vertices, ccw=False):
         """
         Method 3: Preserve original shape by extending edges and connecting intersections.
         Works with any polygon (convex or non-convex).
         
         Args:
             vertices: numpy array of shape (n, 2) representing polygon vertices
+            ccw: True if vertices is already a counter-clockwise float64 array
+                 (as _obstacle_to_vertices returns), skipping the copy and winding check
         
         Returns: 
             vertices of expanded polygon
         """
-        vertices = np.array(vertices)
-        
-        # ROBUST: Ensure counter-clockwise winding order
-        vertices = self._ensure_counter_clockwise(vertices)
-        
-        n = len(vertices)
-        
-        # Compute outward normals and offset edges
-        expanded_edges = []
-        
-        for i in range(n):
-            v1 = vertices[i]
-            v2 = vertices[(i + 1) % n]
+        if not ccw:
+            vertices = np.array(vertices)
             
-            # Edge vector
-            edge = v2 - v1
-            # Outward normal (rotate 90 degrees clockwise for CCW polygon)
-            # For CCW: rotate right (clockwise) gives outward normal
-            normal = np.array([edge[1], -edge[0]])
-            normal_len = np.linalg.norm(normal)
-            if normal_len > 1e-10:
-                normal = normal / normal_len
-            else:
-                normal = np.array([0, 0])
-            
-            # Move edge outward by expansion distance
-            offset = normal * self.d_exp
-            expanded_edges.append([v1 + offset, v2 + offset])
-        
-        # Find intersection points of adjacent expanded edges
-        final_vertices = []
-        for i in range(n):
-            # Current edge
-            p1, p2 = expanded_edges[i]
-            # Next edge
-            p3, p4 = expanded_edges[(i + 1) % n]
-            
-            # Find intersection of lines
-            intersection = self._line_intersection(p1, p2, p3, p4)
-            final_vertices.append(intersection)
-        
-        return np.array(final_vertices)
+            # ROBUST: Ensure counter-clockwise winding order
+            vertices = self._ensure_counter_clockwise(vertices)
+        
+        if HAS_NUMBA:
+            return expand_preserve(np.ascontiguousarray(vertices, dtype=np.float64), float(self.d_exp))
+        
+        # Work on separate x and y columns; edge i runs from vertex i to vertex i + 1
+        xs = np.ascontiguousarray(vertices[:, 0], dtype=np.float64)
+        ys = np.ascontiguousarray(vertices[:, 1], dtype=np.float64)
+        next_xs = self._next_rows(xs)
+        next_ys = self._next_rows(ys)
+        
+        # Outward normals (rotate 90 degrees clockwise for CCW polygon); degenerate edges get none
+        normal_x = next_ys - ys
+        normal_y = xs - next_xs
+        norms = np.sqrt(normal_x * normal_x + normal_y * normal_y)
+        valid = norms > 1e-10
+        scale = np.where(valid, self.d_exp / np.where(valid, norms, 1.0), 0.0)
+        
+        # Move every edge outward by expansion distance
+        offset_x = normal_x * scale
+        offset_y = normal_y * scale
+        x1 = xs + offset_x
+        y1 = ys + offset_y
+        x2 = next_xs + offset_x
+        y2 = next_ys + offset_y
+        
+        # Intersect each expanded edge's line with the next one's
+        return self._intersect_adjacent_lines(x1, y1, x2, y2)
     
-    def expand_polygon_convex(self, vertices):
+    def expand_polygon_convex(self, vertices, ccw=False):
         """
         Method 1: Create convex polygon by connecting expansion points with straight lines.
         Works with any polygon (convex or non-convex).
@@ -384,49 +636,48 @@ class ObstacleExpander:
         
         Args:
             vertices: numpy array of shape (n, 2) representing polygon vertices
+            ccw: True if vertices is already a counter-clockwise float64 array
+                 (as _obstacle_to_vertices returns), skipping the copy and winding check
         
         Returns: 
             vertices of expanded polygon
         """
-        vertices = np.array(vertices)
-        
-        # ROBUST: Ensure counter-clockwise winding order
-        vertices = self._ensure_counter_clockwise(vertices)
-        
-        n = len(vertices)
+        if not ccw:
+            vertices = np.array(vertices)
+            
+            # ROBUST: Ensure counter-clockwise winding order
+            vertices = self._ensure_counter_clockwise(vertices)
         
-        # Compute expansion points at each vertex
-        expanded_vertices = []
+        return self._expand_convex_points(vertices, self.d_exp)
+    
+    @staticmethod
+    def _expand_convex_points(vertices, distance):
+        """
+        Push every vertex out along the normals of the edge before and the edge after it.
         
-        for i in range(n):
-            v_curr = vertices[i]
-            v_prev = vertices[(i - 1) % n]
-            v_next = vertices[(i + 1) % n]
-            
-            # Normals to adjacent edges (outward for CCW polygon)
-            edge_prev = v_curr - v_prev
-            edge_next = v_next - v_curr
-            
-            # Rotate 90 degrees right for outward normal (CCW polygon)
-            normal_prev = np.array([edge_prev[1], -edge_prev[0]])
-            normal_prev_len = np.linalg.norm(normal_prev)
-            if normal_prev_len > 1e-10:
-                normal_prev = normal_prev / normal_prev_len
-            
-            normal_next = np.array([edge_next[1], -edge_next[0]])
-            normal_next_len = np.linalg.norm(normal_next)
-            if normal_next_len > 1e-10:
-                normal_next = normal_next / normal_next_len
-            
-            # Expansion points
-            exp_point_prev = v_curr + normal_prev * self.d_exp
-            exp_point_next = v_curr + normal_next * self.d_exp
+        Args:
+            vertices: numpy array of shape (n, 2); outward normals are on the right of each edge
+            distance: Expansion distance
             
-            expanded_vertices.extend([exp_point_prev, exp_point_next])
-        
-        return np.array(expanded_vertices)
+        Returns:
+            numpy array of shape (2n, 2): each vertex's point on its previous edge's side, then its next edge's
+        """
+        if HAS_NUMBA:
+            return expand_convex(np.ascontiguousarray(vertices, dtype=np.float64), float(distance))
+        
+        # Outward normal of every edge (rotate 90 degrees right for CCW polygon); edge i runs from vertex i to i + 1
+        edge = ObstacleExpander._next_rows(vertices) - vertices
+        normal = np.column_stack([edge[:, 1], -edge[:, 0]])
+        norms = np.sqrt(normal[:, 0] * normal[:, 0] + normal[:, 1] * normal[:, 1])
+        normal = normal / np.where(norms > 1e-10, norms, 1.0)[:, None]
+        
+        # Vertex i sits between edge i - 1 and edge i
+        expanded = np.empty((2 * len(vertices), 2))
+        expanded[0::2] = vertices + ObstacleExpander._previous_rows(normal) * distance
+        expanded[1::2] = vertices + normal * distance
+        return expanded
     
-    def expand_polygon_generalized(self, vertices):
+    def expand_polygon_generalized(self, vertices, ccw=False):
         """
         Method 2: Create generalized polygon with circular arcs at corners.
         Works with any polygon (convex or non-convex).
@@ -434,61 +685,95 @@ class ObstacleExpander:
         
         Args:
             vertices: numpy array of shape (n, 2) representing polygon vertices
+            ccw: True if vertices is already a counter-clockwise float64 array
+                 (as _obstacle_to_vertices returns), skipping the copy and winding check
         
         Returns: 
             (expanded_edges, arc_centers, arc_radius) for visualization
         """
-        vertices = np.array(vertices)
-        
-        # ROBUST: Ensure counter-clockwise winding order
-        vertices = self._ensure_counter_clockwise(vertices)
+        if not ccw:
+            vertices = np.array(vertices)
+            
+            # ROBUST: Ensure counter-clockwise winding order
+            vertices = self._ensure_counter_clockwise(vertices)
         
-        n = len(vertices)
+        # Arc centers are the original vertices; only the caller's (possibly cached,
+        # read-only) array needs copying, the one made above is already private
+        if HAS_NUMBA:
+            vertices = np.ascontiguousarray(vertices, dtype=np.float64)
+            return offset_edges(vertices, float(self.d_exp)), vertices.copy() if ccw else vertices, self.d_exp
         
-        # Expand edges
-        expanded_edges = []
+        # Expand edges; edge i runs from vertex i to vertex i + 1
+        next_vertices = self._next_rows(vertices)
+        edge = next_vertices - vertices
         
-        for i in range(n):
-            v1 = vertices[i]
-            v2 = vertices[(i + 1) % n]
-            
-            edge = v2 - v1
-            # Outward normal (rotate 90 degrees right for CCW polygon)
-            normal = np.array([edge[1], -edge[0]])
-            normal_len = np.linalg.norm(normal)
-            if normal_len > 1e-10:
-                normal = normal / normal_len
-            
-            offset = normal * self.d_exp
-            expanded_edges.append([v1 + offset, v2 + offset])
+        # Outward normals (rotate 90 degrees right for CCW polygon)
+        normal = np.column_stack([edge[:, 1], -edge[:, 0]])
+        norms = np.sqrt(normal[:, 0] * normal[:, 0] + normal[:, 1] * normal[:, 1])
+        normal = normal / np.where(norms > 1e-10, norms, 1.0)[:, None]
         
-        # Arc centers are the original vertices
-        arc_centers = vertices.copy()
+        offset = normal * self.d_exp
+        expanded_edges = np.stack([vertices + offset, next_vertices + offset], axis=1)
         
-        return expanded_edges, arc_centers, self.d_exp
+        return expanded_edges, vertices.copy() if ccw else vertices, self.d_exp
     
-    def _line_intersection(self, p1, p2, p3, p4):
-        """Find intersection point of two lines defined by points (p1,p2) and (p3,p4)"""
-        x1, y1 = p1
-        x2, y2 = p2
-        x3, y3 = p3
-        x4, y4 = p4
-        
-        denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
-        if abs(denom) < 1e-10:
-            return (p2 + p3) / 2  # Parallel lines, return midpoint
-        
-        t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / denom
+    @staticmethod
+    def _next_rows(values):
+        """Get a copy of an array shifted so row i holds row i + 1, wrapping around
         
-        x = x1 + t * (x2 - x1)
-        y = y1 + t * (y2 - y1)
+        Same as np.roll(values, -1, axis=0) without np.roll's per-call overhead.
+        """
+        shifted = np.empty_like(values)
+        if len(values):
+            shifted[:-1] = values[1:]
+            shifted[-1] = values[0]
+        return shifted
+    
+    @staticmethod
+    def _previous_rows(values):
+        """Get a copy of an array shifted so row i holds row i - 1, wrapping around"""
+        shifted = np.empty_like(values)
+        if len(values):
+            shifted[1:] = values[:-1]
+            shifted[0] = values[-1]
+        return shifted
+    
+    @staticmethod
+    def _intersect_adjacent_lines(x1, y1, x2, y2):
+        """Intersect the line through each offset edge with the line through the next one
         
-        return np.array([x, y])
+        Args:
+            x1, y1, x2, y2: Arrays with the start and end point of every offset edge
+            
+        Returns:
+            numpy array of shape (n, 2); row i is where edge i meets edge i + 1,
+            or the midpoint between them if the two are parallel
+        """
+        x3 = ObstacleExpander._next_rows(x1)
+        y3 = ObstacleExpander._next_rows(y1)
+        x4 = ObstacleExpander._next_rows(x2)
+        y4 = ObstacleExpander._next_rows(y2)
+        dx34 = x3 - x4
+        dy34 = y3 - y4
+        denom = (x1 - x2) * dy34 - (y1 - y2) * dx34
+        parallel = np.abs(denom) < 1e-10
+        t = ((x1 - x3) * dy34 - (y1 - y3) * dx34) / np.where(parallel, 1.0, denom)
+        
+        return np.column_stack([
+            np.where(parallel, (x2 + x3) / 2, x1 + t * (x2 - x1)),
+            np.where(parallel, (y2 + y3) / 2, y1 + t * (y2 - y1))
+        ])
     
     def expand_all_obstacles(self, obstacles_list, method=None):
         """
         Expand all obstacles in the list.
         
+        Each entry matches what expand_obstacle returns for that obstacle. With numba, the
+        polygons of each method are packed into one zero-padded (K, N, 2) array and expanded
+        by a single parallel kernel call. Directional expansions, and everything when numba
+        is unavailable, go through expand_obstacle one by one. Obstacles that fail to expand
+        are skipped with a warning.
+        
         Args:
             obstacles_list: List of obstacle dictionaries
             method: Optional override for expansion method
@@ -496,21 +781,63 @@ class ObstacleExpander:
         Returns:
             List of expanded obstacle data (format depends on method)
         """
-        expanded = []
-        for obstacle in obstacles_list:
-            try:
-                expanded_data = self.expand_obstacle(obstacle, method)
-                if expanded_data is not None:  # Only add if expansion occurred
-                    expanded.append({
-                        'original': obstacle,
-                        'expanded': expanded_data,
-                        'method': method or obstacle.get('expansion_method', self.METHOD_GENERALIZED)
-                    })
-            except Exception as e:
-                api_core.log(f"Warning: Failed to expand obstacle: {e}", "warning")
+        kernels = {
+            self.METHOD_PRESERVE_SHAPE: expand_preserve_batch,
+            self.METHOD_CONVEX: expand_convex_batch,
+            self.METHOD_GENERALIZED: offset_edges_batch
+        }
+        
+        results = [None] * len(obstacles_list)
+        groups = {}  # method -> list of (index, CCW vertices, expansion distance)
+        
+        for index, obstacle in enumerate(obstacles_list):
+            obstacle_method = method or obstacle.get('expansion_method', self.METHOD_GENERALIZED)
+            if (not HAS_NUMBA or obstacle_method not in kernels or
+                    obstacle.get('use_directional_expansion', False)):
+                try:
+                    results[index] = self.expand_obstacle(obstacle, method)
+                except Exception as e:
+                    print(f"Warning: Failed to expand obstacle: {e}")
                 continue
+            
+            distance = obstacle.get('expansion_distance', self.d_exp)
+            if distance <= 0:
+                continue
+            
+            vertices = self._obstacle_to_vertices(obstacle)
+            if obstacle.get('force_convex_hull', self.force_convex_hull):
+                vertices = self._compute_convex_hull(vertices)
+            
+            groups.setdefault(obstacle_method, []).append((index, vertices, distance))
+        
+        for obstacle_method, items in groups.items():
+            counts = np.array([len(vertices) for _, vertices, _ in items], dtype=np.int64)
+            padded = np.zeros((len(items), counts.max(), 2))
+            for row, (_, vertices, _) in enumerate(items):
+                padded[row, :len(vertices)] = vertices
+            distances = np.array([distance for _, _, distance in items], dtype=np.float64)
+            
+            expanded = kernels[obstacle_method](padded, counts, distances)
+            
+            for row, (index, vertices, distance) in enumerate(items):
+                count = counts[row]
+                if obstacle_method == self.METHOD_GENERALIZED:
+                    polygon_result = (expanded[row, :count], vertices, distance)
+                elif obstacle_method == self.METHOD_CONVEX:
+                    polygon_result = expanded[row, :2 * count]
+                else:
+                    polygon_result = expanded[row, :count]
+                results[index] = self._to_qt_result(obstacle_method, polygon_result)
         
-        return expanded
+        return [
+            {
+                'original': obstacle,
+                'expanded': expanded_data,
+                'method': method or obstacle.get('expansion_method', self.METHOD_GENERALIZED)
+            }
+            for obstacle, expanded_data in zip(obstacles_list, results)
+            if expanded_data is not None
+        ]
     
     def expand_rectangle_directional(self, obstacle):
         """
@@ -523,9 +850,16 @@ class ObstacleExpander:
             obstacle: Rectangle obstacle dictionary with directional expansion values
             
         Returns:
-            For preserve_shape/convex: List of QPointF representing expanded polygon vertices
+            For preserve_shape/convex: QPolygonF of the expanded polygon vertices
             For generalized: Tuple of (edges, arc_centers, arc_radius)
         """
+        raw = self._expand_rectangle_directional_raw(obstacle)
+        if raw is None:
+            return None
+        return self._to_qt_result(*raw)
+    
+    def _expand_rectangle_directional_raw(self, obstacle):
+        """Array version of expand_rectangle_directional (same format as expand_obstacle_raw)"""
         if obstacle.get('type') != 'rectangle':
             raise ValueError("Directional expansion only works with rectangles")
         
@@ -562,86 +896,16 @@ class ObstacleExpander:
         # Apply rotation if needed
         if rotation != 0:
             center = np.array([width / 2, height / 2])
-            rad = math.radians(rotation)
-            cos_r, sin_r = math.cos(rad), math.sin(rad)
-            rotation_matrix = np.array([
-                [cos_r, -sin_r],
-                [sin_r, cos_r]
-            ])
-            
             # Rotate around original center
-            local_vertices = (local_vertices - center) @ rotation_matrix.T + center
+            local_vertices = self._rotate_about(local_vertices, center, rotation)
         
         # Translate to world position
         world_vertices = local_vertices + np.array([x, y])
         
-        # Get expansion method from obstacle
+        # Apply the expansion method to the directional polygon (unknown methods keep its shape)
         method = obstacle.get('expansion_method', self.METHOD_GENERALIZED)
-        
-        # Apply expansion method to the directional rectangle
-        if method == self.METHOD_GENERALIZED:
-            # For generalized method, create edges and arc centers
-            edges = []
-            n = len(world_vertices)
-            
-            for i in range(n):
-                v1 = world_vertices[i]
-                v2 = world_vertices[(i + 1) % n]
-                edges.append([QPointF(v1[0], v1[1]), QPointF(v2[0], v2[1])])
-            
-            # Arc centers are at the corners of the directional rectangle
-            arc_centers = [QPointF(v[0], v[1]) for v in world_vertices]
-            
-            # Use the maximum directional expansion as the arc radius
-            arc_radius = max(exp_north, exp_south, exp_east, exp_west)
-            
-            return (edges, arc_centers, arc_radius)
-        
-        elif method == self.METHOD_CONVEX:
-            # For convex method, expand each vertex outward
-            # This creates a "rounded" effect at corners
-            expanded_vertices = []
-            n = len(world_vertices)
-            
-            for i in range(n):
-                v_curr = world_vertices[i]
-                v_prev = world_vertices[(i - 1) % n]
-                v_next = world_vertices[(i + 1) % n]
-                
-                # Normals to adjacent edges
-                edge_prev = v_curr - v_prev
-                edge_next = v_next - v_curr
-                
-                # Outward normals
-                normal_prev = np.array([edge_prev[1], -edge_prev[0]])
-                normal_prev_len = np.linalg.norm(normal_prev)
-                if normal_prev_len > 1e-10:
-                    normal_prev = normal_prev / normal_prev_len
-                
-                normal_next = np.array([edge_next[1], -edge_next[0]])
-                normal_next_len = np.linalg.norm(normal_next)
-                if normal_next_len > 1e-10:
-                    normal_next = normal_next / normal_next_len
-                
-                # Use average directional expansion for this corner
-                # Determine which corner this is based on local coordinates
-                corner_expansion = (exp_north + exp_south + exp_east + exp_west) / 4
-                
-                # Expansion points
-                exp_point_prev = v_curr + normal_prev * corner_expansion
-                exp_point_next = v_curr + normal_next * corner_expansion
-                
-                expanded_vertices.extend([exp_point_prev, exp_point_next])
-            
-            # Convert to QPointF
-            result = [QPointF(v[0], v[1]) for v in expanded_vertices]
-            return result
-        
-        else:  # METHOD_PRESERVE_SHAPE
-            # For preserve shape, the directional rectangle itself preserves the shape
-            # Just return the vertices as-is
-            result = [QPointF(v[0], v[1]) for v in world_vertices]
-            return result
+        expand = self._directional_methods.get(method, self._directional_preserve_shape)
+        return expand(world_vertices, exp_north, exp_south, exp_east, exp_west)
     
     def expand_polygon_directional(self, obstacle):
         """
@@ -653,9 +917,16 @@ class ObstacleExpander:
             obstacle: Obstacle dictionary with directional expansion values
             
         Returns:
-            For preserve_shape/convex: List of QPointF representing expanded polygon vertices
+            For preserve_shape/convex: QPolygonF of the expanded polygon vertices
             For generalized: Tuple of (edges, arc_centers, arc_radius)
         """
+        raw = self._expand_polygon_directional_raw(obstacle)
+        if raw is None:
+            return None
+        return self._to_qt_result(*raw)
+    
+    def _expand_polygon_directional_raw(self, obstacle):
+        """Array version of expand_polygon_directional (same format as expand_obstacle_raw)"""
         obstacle_type = obstacle.get('type')
         if obstacle_type not in ['triangle', 'pentagon', 'hexagon']:
             raise ValueError(f"Quadrant-based directional expansion not supported for {obstacle_type}")
@@ -684,164 +955,75 @@ class ObstacleExpander:
         # Calculate center point (in local coordinates)
         center = np.mean(local_vertices, axis=0)
         
-        # Expand each edge based on quadrant assignment
-        expanded_vertices = []
-        n = len(local_vertices)
-        
-        for i in range(n):
-            v1 = local_vertices[i]
-            v2 = local_vertices[(i + 1) % n]
-            
-            # Calculate edge midpoint
-            edge_midpoint = (v1 + v2) / 2
-            
-            # Determine which quadrants this edge belongs to
-            is_north = edge_midpoint[1] < center[1]  # Above center (Y increases downward)
-            is_south = edge_midpoint[1] > center[1]  # Below center
-            is_west = edge_midpoint[0] < center[0]   # Left of center
-            is_east = edge_midpoint[0] > center[0]   # Right of center
-            
-            # Calculate expansion for this edge based on quadrant
-            # Edges can belong to multiple quadrants (e.g., top-left edge is both North and West)
-            expansion_x = 0
-            expansion_y = 0
-            
-            if is_north:
-                expansion_y -= exp_north  # Expand upward (negative Y)
-            if is_south:
-                expansion_y += exp_south  # Expand downward (positive Y)
-            if is_west:
-                expansion_x -= exp_west   # Expand leftward (negative X)
-            if is_east:
-                expansion_x += exp_east   # Expand rightward (positive X)
-            
-            # Calculate edge normal (outward)
-            edge = v2 - v1
-            normal = np.array([edge[1], -edge[0]])  # Rotate 90 degrees right
-            normal_len = np.linalg.norm(normal)
-            if normal_len > 1e-10:
-                normal = normal / normal_len
-            
-            # Project directional expansion onto edge normal
-            directional_offset = np.array([expansion_x, expansion_y])
-            expansion_magnitude = np.dot(directional_offset, normal)
-            
-            # Expand the edge
-            offset = normal * expansion_magnitude
-            expanded_v1 = v1 + offset
-            expanded_v2 = v2 + offset
-            
-            expanded_vertices.append((expanded_v1, expanded_v2))
+        # Edge i runs from vertex i to vertex i + 1
+        xs = local_vertices[:, 0]
+        ys = local_vertices[:, 1]
+        next_xs = self._next_rows(xs)
+        next_ys = self._next_rows(ys)
+        
+        # Determine which quadrants each edge's midpoint falls in (Y increases downward)
+        # Edges can belong to multiple quadrants (e.g., top-left edge is both North and West)
+        mid_x = (xs + next_xs) / 2
+        mid_y = (ys + next_ys) / 2
+        expansion_x = np.where(mid_x > center[0], exp_east, 0) - np.where(mid_x < center[0], exp_west, 0)
+        expansion_y = np.where(mid_y > center[1], exp_south, 0) - np.where(mid_y < center[1], exp_north, 0)
+        
+        # Outward edge normals (rotate 90 degrees right)
+        normal_x = next_ys - ys
+        normal_y = xs - next_xs
+        norms = np.sqrt(normal_x * normal_x + normal_y * normal_y)
+        norms = np.where(norms > 1e-10, norms, 1.0)
+        normal_x = normal_x / norms
+        normal_y = normal_y / norms
+        
+        # Project directional expansion onto edge normal and move each edge by it
+        magnitude = expansion_x * normal_x + expansion_y * normal_y
+        offset_x = normal_x * magnitude
+        offset_y = normal_y * magnitude
         
         # Find intersection points of adjacent expanded edges
-        final_vertices = []
-        for i in range(n):
-            # Current edge
-            p1, p2 = expanded_vertices[i]
-            # Next edge
-            p3, p4 = expanded_vertices[(i + 1) % n]
-            
-            # Find intersection of lines
-            intersection = self._line_intersection(p1, p2, p3, p4)
-            final_vertices.append(intersection)
-        
-        final_vertices = np.array(final_vertices)
+        final_vertices = self._intersect_adjacent_lines(
+            xs + offset_x, ys + offset_y, next_xs + offset_x, next_ys + offset_y)
         
         # Apply rotation if needed
         if rotation != 0:
-            rad = math.radians(rotation)
-            cos_r, sin_r = math.cos(rad), math.sin(rad)
-            rotation_matrix = np.array([
-                [cos_r, -sin_r],
-                [sin_r, cos_r]
-            ])
-            
             # Rotate around original center
-            final_vertices = (final_vertices - center) @ rotation_matrix.T + center
+            final_vertices = self._rotate_about(final_vertices, center, rotation)
         
         # Translate to world position
         world_vertices = final_vertices + np.array([x, y])
         
-        # Get expansion method from obstacle
+        # Apply the expansion method to the directional polygon (unknown methods keep its shape)
         method = obstacle.get('expansion_method', self.METHOD_GENERALIZED)
+        expand = self._directional_methods.get(method, self._directional_preserve_shape)
+        return expand(world_vertices, exp_north, exp_south, exp_east, exp_west)
+    
+    def _directional_generalized(self, world_vertices, exp_north, exp_south, exp_east, exp_west):
+        """Generalized result of a directionally expanded polygon: its edges with arcs at the corners"""
+        edges = np.stack([world_vertices, self._next_rows(world_vertices)], axis=1)
         
-        # Apply expansion method
-        if method == self.METHOD_GENERALIZED:
-            # For generalized method, create edges and arc centers
-            edges = []
-            n = len(world_vertices)
-            
-            for i in range(n):
-                v1 = world_vertices[i]
-                v2 = world_vertices[(i + 1) % n]
-                edges.append([QPointF(v1[0], v1[1]), QPointF(v2[0], v2[1])])
-            
-            # Arc centers are at the expanded corners
-            arc_centers = [QPointF(v[0], v[1]) for v in world_vertices]
-            
-            # Use the maximum directional expansion as the arc radius
-            arc_radius = max(exp_north, exp_south, exp_east, exp_west)
-            
-            return (edges, arc_centers, arc_radius)
+        # Use the maximum directional expansion as the arc radius
+        arc_radius = max(exp_north, exp_south, exp_east, exp_west)
         
-        elif method == self.METHOD_CONVEX:
-            # For convex method, further expand each vertex outward
-            expanded_final = []
-            n = len(world_vertices)
-            
-            for i in range(n):
-                v_curr = world_vertices[i]
-                v_prev = world_vertices[(i - 1) % n]
-                v_next = world_vertices[(i + 1) % n]
-                
-                # Normals to adjacent edges
-                edge_prev = v_curr - v_prev
-                edge_next = v_next - v_curr
-                
-                # Outward normals
-                normal_prev = np.array([edge_prev[1], -edge_prev[0]])
-                normal_prev_len = np.linalg.norm(normal_prev)
-                if normal_prev_len > 1e-10:
-                    normal_prev = normal_prev / normal_prev_len
-                
-                normal_next = np.array([edge_next[1], -edge_next[0]])
-                normal_next_len = np.linalg.norm(normal_next)
-                if normal_next_len > 1e-10:
-                    normal_next = normal_next / normal_next_len
-                
-                # Use average directional expansion
-                avg_expansion = (exp_north + exp_south + exp_east + exp_west) / 4
-                
-                # Expansion points
-                exp_point_prev = v_curr + normal_prev * avg_expansion
-                exp_point_next = v_curr + normal_next * avg_expansion
-                
-                expanded_final.extend([exp_point_prev, exp_point_next])
-            
-            # Convert to QPointF
-            result = [QPointF(v[0], v[1]) for v in expanded_final]
-            return result
+        return self.METHOD_GENERALIZED, (edges, world_vertices, arc_radius)
+    
+    def _directional_convex(self, world_vertices, exp_north, exp_south, exp_east, exp_west):
+        """Convex result of a directionally expanded polygon: its vertices pushed out by the average expansion"""
+        avg_expansion = (exp_north + exp_south + exp_east + exp_west) / 4
         
-        else:  # METHOD_PRESERVE_SHAPE
-            # Return the expanded vertices as-is
-            result = [QPointF(v[0], v[1]) for v in world_vertices]
-            return result
+        return self.METHOD_CONVEX, self._expand_convex_points(world_vertices, avg_expansion)
+    
+    def _directional_preserve_shape(self, world_vertices, exp_north, exp_south, exp_east, exp_west):
+        """Preserve-shape result of a directionally expanded polygon: the polygon itself"""
+        return self.METHOD_PRESERVE_SHAPE, world_vertices
     
     def _get_local_vertices_for_type(self, obstacle_type, width, height):
         """Get local vertices for a specific obstacle type"""
         if obstacle_type == 'triangle':
-            return np.array([
-                [width / 2, 0],       # Top center
-                [width, height],      # Bottom right
-                [0, height]           # Bottom left
-            ])
+            return self._UNIT_TRIANGLE * (width, height)
         elif obstacle_type == 'pentagon':
-            cx, cy = width / 2, height / 2
-            radius = min(width, height) / 2
-            return self._regular_polygon_vertices(cx, cy, radius, 5)
+            return self._local_polygon_vertices(width, height, 5)
         elif obstacle_type == 'hexagon':
-            cx, cy = width / 2, height / 2
-            radius = min(width, height) / 2
-            return self._regular_polygon_vertices(cx, cy, radius, 6)
+            return self._local_polygon_vertices(width, height, 6)
         else:
             raise ValueError(f"Unknown obstacle type: {obstacle_type}")
\ No newline at end of file
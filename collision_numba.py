@@ -0,0 +1,383 @@
+"""Compiled kernels for collision and polygon geometry
+
+Numba is optional. aabb_candidates falls back to plain NumPy code; the
+geometry kernels below it stay plain Python without numba, so callers should
+check HAS_NUMBA and use their vectorized NumPy paths instead. Callers import
+the kernels once at module level; HAS_NUMBA is the single fallback flag.
+Compiled kernels are cached on disk, so only the very first run pays for
+compilation. The *_batch kernels spread their polygons over threads with prange.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+
+def _jit(func):
+    """Compile a kernel with numba when it is available"""
+    if HAS_NUMBA:
+        return njit(cache=True)(func)
+    return func
+
+
+def _jit_parallel(func):
+    """Compile a kernel with numba when it is available, running its prange loops in parallel"""
+    if HAS_NUMBA:
+        return njit(parallel=True, cache=True)(func)
+    return func
+
+
+def _aabb_candidates_numpy(xs, ys, ws, hs, x1, y1, x2, y2):
+    """Get indices of boxes touching the box from (x1, y1) to (x2, y2)
+    
+    Args:
+        xs, ys, ws, hs: Parallel arrays with the x, y, width and height of each box
+        x1, y1, x2, y2: Corners of the query box
+    
+    Returns:
+        Array of indices in ascending order
+    """
+    mask = (xs <= x2) & (xs + ws >= x1) & (ys <= y2) & (ys + hs >= y1)
+    return np.nonzero(mask)[0]
+
+
+if HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def aabb_candidates(xs, ys, ws, hs, x1, y1, x2, y2):
+        """Get indices of boxes touching the box from (x1, y1) to (x2, y2)
+        
+        Args:
+            xs, ys, ws, hs: Parallel arrays with the x, y, width and height of each box
+            x1, y1, x2, y2: Corners of the query box
+        
+        Returns:
+            Array of indices in ascending order
+        """
+        out = np.empty(xs.shape[0], dtype=np.intp)
+        count = 0
+        for i in range(xs.shape[0]):
+            if xs[i] <= x2 and xs[i] + ws[i] >= x1 and ys[i] <= y2 and ys[i] + hs[i] >= y1:
+                out[count] = i
+                count += 1
+        return out[:count]
+else:
+    aabb_candidates = _aabb_candidates_numpy
+
+
+@_jit
+def _orientation(px, py, qx, qy, rx, ry):
+    """Get 0 if p, q, r are collinear, otherwise 1 or 2 depending on the turn direction"""
+    val = (qy - py) * (rx - qx) - (qx - px) * (ry - qy)
+    if val == 0:
+        return 0
+    return 1 if val > 0 else 2
+
+
+@_jit
+def _on_segment(px, py, qx, qy, rx, ry):
+    """Check if q lies within the bounding box of segment p-r"""
+    return min(px, rx) <= qx <= max(px, rx) and min(py, ry) <= qy <= max(py, ry)
+
+
+@_jit
+def segments_intersect(ax, ay, bx, by, cx, cy, dx, dy):
+    """Check if segment a-b intersects segment c-d (touching counts)"""
+    o1 = _orientation(ax, ay, bx, by, cx, cy)
+    o2 = _orientation(ax, ay, bx, by, dx, dy)
+    o3 = _orientation(cx, cy, dx, dy, ax, ay)
+    o4 = _orientation(cx, cy, dx, dy, bx, by)
+    
+    if o1 != o2 and o3 != o4:
+        return True
+    
+    return ((o1 == 0 and _on_segment(ax, ay, cx, cy, bx, by)) or
+            (o2 == 0 and _on_segment(ax, ay, dx, dy, bx, by)) or
+            (o3 == 0 and _on_segment(cx, cy, ax, ay, dx, dy)) or
+            (o4 == 0 and _on_segment(cx, cy, bx, by, dx, dy)))
+
+
+@_jit
+def self_intersections(vertices):
+    """Find the pairs of non-adjacent polygon edges that intersect
+    
+    Args:
+        vertices: (N, 2) float64 array; edge i runs from vertex i to vertex i + 1
+    
+    Returns:
+        (K, 2) int32 array of (i, j) edge pairs with i < j
+    """
+    n = vertices.shape[0]
+    out = np.empty((max(n * (n - 3) // 2, 0), 2), dtype=np.int32)
+    count = 0
+    
+    # Repeat the first vertex at the end so edge i always ends at row i + 1
+    closed = np.empty((n + 1, 2))
+    closed[:n] = vertices
+    if n:
+        closed[n] = vertices[0]
+    
+    for i in range(n):
+        ax, ay = closed[i, 0], closed[i, 1]
+        bx, by = closed[i + 1, 0], closed[i + 1, 1]
+        
+        for j in range(i + 2, n):
+            if j == n - 1 and i == 0:
+                continue
+            
+            # Edges whose boxes don't touch can't intersect
+            cx, cy = closed[j, 0], closed[j, 1]
+            dx, dy = closed[j + 1, 0], closed[j + 1, 1]
+            if (max(ax, bx) < min(cx, dx) or max(cx, dx) < min(ax, bx) or
+                    max(ay, by) < min(cy, dy) or max(cy, dy) < min(ay, by)):
+                continue
+            
+            if segments_intersect(ax, ay, bx, by, cx, cy, dx, dy):
+                out[count, 0] = i
+                out[count, 1] = j
+                count += 1
+    
+    return out[:count]
+
+
+@_jit
+def _folds_back(sx, sy, ax, ay, bx, by):
+    """Check if the segment (sx, sy) -> (bx, by) runs back along the segment (sx, sy) -> (ax, ay)"""
+    ux, uy = ax - sx, ay - sy
+    vx, vy = bx - sx, by - sy
+    return ux * vy - uy * vx == 0 and ux * vx + uy * vy > 0
+
+
+@_jit
+def new_edge_intersects(vertices, x, y):
+    """Check if closing an open polyline through a new point (x, y) would cross its edges
+    
+    Same test as CollisionDetector.check_new_edge_intersection: the edge from the last
+    vertex to the new point against every polyline edge but the last, and the edge
+    from the new point back to the first vertex against every edge but the first.
+    """
+    n = vertices.shape[0]
+    if n < 2:
+        return False
+    
+    # The edges sharing an endpoint with a new edge only count when it doubles back along them
+    if (_folds_back(vertices[n - 1, 0], vertices[n - 1, 1], vertices[n - 2, 0], vertices[n - 2, 1], x, y) or
+            _folds_back(vertices[0, 0], vertices[0, 1], vertices[1, 0], vertices[1, 1], x, y)):
+        return True
+    
+    lx, ly = vertices[n - 1, 0], vertices[n - 1, 1]
+    for i in range(n - 2):
+        if segments_intersect(lx, ly, x, y,
+                              vertices[i, 0], vertices[i, 1], vertices[i + 1, 0], vertices[i + 1, 1]):
+            return True
+    
+    fx, fy = vertices[0, 0], vertices[0, 1]
+    for i in range(1, n - 1):
+        if segments_intersect(x, y, fx, fy,
+                              vertices[i, 0], vertices[i, 1], vertices[i + 1, 0], vertices[i + 1, 1]):
+            return True
+    
+    return False
+
+
+@_jit
+def _axis_gap(vertices1, vertices2, nx, ny):
+    """Get the separation of two point sets projected onto the axis (nx, ny)"""
+    min1 = max1 = vertices1[0, 0] * nx + vertices1[0, 1] * ny
+    for k in range(1, vertices1.shape[0]):
+        p = vertices1[k, 0] * nx + vertices1[k, 1] * ny
+        min1 = min(min1, p)
+        max1 = max(max1, p)
+    
+    min2 = max2 = vertices2[0, 0] * nx + vertices2[0, 1] * ny
+    for k in range(1, vertices2.shape[0]):
+        p = vertices2[k, 0] * nx + vertices2[k, 1] * ny
+        min2 = min(min2, p)
+        max2 = max(max2, p)
+    
+    return max(min2 - max1, min1 - max2)
+
+
+@_jit
+def sat_gap(vertices1, vertices2):
+    """Get the largest separation between two convex polygons along their edge normals
+    
+    Same result as CollisionDetector._sat_gap: positive if a separating axis
+    exists, otherwise zero or the (negative) smallest penetration.
+    """
+    best = -np.inf
+    for polygon in (vertices1, vertices2):
+        n = polygon.shape[0]
+        if n == 0:
+            continue
+        
+        # Walk the edges as (previous vertex, vertex), starting with the closing edge
+        px, py = polygon[n - 1, 0], polygon[n - 1, 1]
+        for i in range(n):
+            x, y = polygon[i, 0], polygon[i, 1]
+            ex = x - px
+            ey = y - py
+            px, py = x, y
+            length = np.hypot(ex, ey)
+            if length <= 1e-9:
+                continue
+            
+            gap = _axis_gap(vertices1, vertices2, -ey / length, ex / length)
+            if gap > best:
+                best = gap
+    
+    return best
+
+
+@_jit
+def fill_regular_polygons(cx, cy, radius, num_sides, out):
+    """Write the vertices of many regular polygons into one buffer
+    
+    Matches utils.calculate_polygon_points: the first vertex is straight above the center.
+    
+    Args:
+        cx, cy, radius: float64 arrays with the center and radius of each polygon
+        num_sides: int64 array with the side count of each polygon
+        out: (N, 2 * max(num_sides)) float64 array; row i receives x0, y0, x1, y1, ...
+    """
+    for i in range(cx.shape[0]):
+        n = num_sides[i]
+        for k in range(n):
+            angle = -np.pi / 2 + 2 * np.pi * k / n
+            out[i, 2 * k] = cx[i] + radius[i] * np.cos(angle)
+            out[i, 2 * k + 1] = cy[i] + radius[i] * np.sin(angle)
+
+
+@_jit
+def _unit_normal(ax, ay, bx, by):
+    """Get the outward unit normal of edge a-b of a CCW polygon, or (0, 0) if the edge is degenerate"""
+    ex = bx - ax
+    ey = by - ay
+    length = np.sqrt(ey * ey + ex * ex)
+    if length > 1e-10:
+        return ey / length, -ex / length
+    return 0.0, 0.0
+
+
+@_jit
+def offset_edges(vertices, distance):
+    """Move every edge of a CCW polygon outward
+    
+    Args:
+        vertices: (N, 2) float64 array; edge i runs from vertex i to vertex i + 1
+        distance: Offset distance
+    
+    Returns:
+        (N, 2, 2) float64 array with the start and end point of each offset edge
+    """
+    n = vertices.shape[0]
+    out = np.empty((n, 2, 2))
+    for i in range(n):
+        j = i + 1 if i + 1 < n else 0
+        nx, ny = _unit_normal(vertices[i, 0], vertices[i, 1], vertices[j, 0], vertices[j, 1])
+        out[i, 0, 0] = vertices[i, 0] + nx * distance
+        out[i, 0, 1] = vertices[i, 1] + ny * distance
+        out[i, 1, 0] = vertices[j, 0] + nx * distance
+        out[i, 1, 1] = vertices[j, 1] + ny * distance
+    return out
+
+
+@_jit
+def expand_preserve(vertices, distance):
+    """Same result as ObstacleExpander.expand_polygon_preserve_shape on a CCW polygon
+    
+    Each offset edge's line is intersected with the next one's; parallel
+    neighbours meet at the midpoint between them.
+    """
+    n = vertices.shape[0]
+    edges = offset_edges(vertices, distance)
+    out = np.empty((n, 2))
+    for i in range(n):
+        j = i + 1 if i + 1 < n else 0
+        x1, y1 = edges[i, 0, 0], edges[i, 0, 1]
+        x2, y2 = edges[i, 1, 0], edges[i, 1, 1]
+        x3, y3 = edges[j, 0, 0], edges[j, 0, 1]
+        x4, y4 = edges[j, 1, 0], edges[j, 1, 1]
+        
+        denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+        if abs(denom) < 1e-10:
+            out[i, 0] = (x2 + x3) / 2
+            out[i, 1] = (y2 + y3) / 2
+        else:
+            t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / denom
+            out[i, 0] = x1 + t * (x2 - x1)
+            out[i, 1] = y1 + t * (y2 - y1)
+    return out
+
+
+@_jit
+def expand_convex(vertices, distance):
+    """Same result as ObstacleExpander.expand_polygon_convex on a CCW polygon
+    
+    Every vertex becomes two points, pushed out along the normals of the edge
+    before and the edge after it.
+    """
+    n = vertices.shape[0]
+    out = np.empty((2 * n, 2))
+    if n == 0:
+        return out
+    
+    # Each edge's normal is computed once and carried over as the next vertex's previous one
+    px, py = _unit_normal(vertices[n - 1, 0], vertices[n - 1, 1], vertices[0, 0], vertices[0, 1])
+    for i in range(n):
+        j = i + 1 if i + 1 < n else 0
+        x, y = vertices[i, 0], vertices[i, 1]
+        nx, ny = _unit_normal(x, y, vertices[j, 0], vertices[j, 1])
+        out[2 * i, 0] = x + px * distance
+        out[2 * i, 1] = y + py * distance
+        out[2 * i + 1, 0] = x + nx * distance
+        out[2 * i + 1, 1] = y + ny * distance
+        px, py = nx, ny
+    return out
+
+
+@_jit_parallel
+def expand_preserve_batch(vertices, counts, distances):
+    """Run expand_preserve over many polygons packed into one padded array
+    
+    Args:
+        vertices: (K, N, 2) float64 array; polygon k is vertices[k, :counts[k]] (CCW)
+        counts: (K,) int64 array of vertex counts
+        distances: (K,) float64 array of expansion distances
+    
+    Returns:
+        (K, N, 2) float64 array; polygon k's result is in the first counts[k] rows
+    """
+    out = np.zeros(vertices.shape)
+    for k in prange(vertices.shape[0]):
+        out[k, :counts[k]] = expand_preserve(vertices[k, :counts[k]], distances[k])
+    return out
+
+
+@_jit_parallel
+def expand_convex_batch(vertices, counts, distances):
+    """Run expand_convex over many polygons packed into one padded array
+    
+    Same arguments as expand_preserve_batch; polygon k's result is in the
+    first 2 * counts[k] rows of a (K, 2 * N, 2) array.
+    """
+    out = np.zeros((vertices.shape[0], 2 * vertices.shape[1], 2))
+    for k in prange(vertices.shape[0]):
+        out[k, :2 * counts[k]] = expand_convex(vertices[k, :counts[k]], distances[k])
+    return out
+
+
+@_jit_parallel
+def offset_edges_batch(vertices, counts, distances):
+    """Run offset_edges over many polygons packed into one padded array
+    
+    Same arguments as expand_preserve_batch; polygon k's edges are in the
+    first counts[k] rows of a (K, N, 2, 2) array.
+    """
+    out = np.zeros((vertices.shape[0], vertices.shape[1], 2, 2))
+    for k in prange(vertices.shape[0]):
+        out[k, :counts[k]] = offset_edges(vertices[k, :counts[k]], distances[k])
+    return out
@@ -1,11 +1,18 @@
 ﻿from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QStatusBar, QScrollArea, QApplication)
 from PyQt5.QtCore import Qt
+import re
 from Canvas import Canvas
 from UIComponents import UIComponents
 from collisionBoxExpansion import ObstacleExpander
 
 
+# Text accepted by int() and (apart from inf/nan) float(), checked up front so
+# half-typed input is rejected without raising
+_INT_RE = re.compile(r'\s*[-+]?\d+\s*$')
+_FLOAT_RE = re.compile(r'\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$')
+
+
 class MainWindow(QMainWindow):
     """Main application window"""
     
@@ -56,11 +63,8 @@ class MainWindow(QMainWindow):
          self.width_input, self.height_input, self.rotation_input,
          self.expansion_distance_input, self.expansion_method_combo, 
          self.add_collision_box_btn, self.delete_btn, self.convex_hull_toggle,
-         self.expansion_north_input, self.expansion_south_input, 
-         self.expansion_east_input, self.expansion_west_input,
          self.directional_grid, self.directional_expansion_label,
-         self.apply_north_btn, self.apply_south_btn, 
-         self.apply_east_btn, self.apply_west_btn) = UIComponents.create_properties_panel(
+         self._build_directional_rows) = UIComponents.create_properties_panel(
             self.on_property_changed,
             self.delete_selected_obstacle,
             self.add_collision_box,
@@ -69,6 +73,10 @@ class MainWindow(QMainWindow):
         )
         main_h_layout.addWidget(self.side_panel)
         
+        # Method constant -> its index in the method combo box
+        self._method_index = {self.expansion_method_combo.itemData(i): i
+                              for i in range(self.expansion_method_combo.count())}
+        
         # Create status bar
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
@@ -85,6 +93,12 @@ class MainWindow(QMainWindow):
             self.update_properties_panel(self.canvas.selected_obstacle)
             return
         
+        number_re = _FLOAT_RE if property_name == 'rotation' else _INT_RE
+        if not number_re.match(value):
+            self.status_bar.showMessage("Invalid value entered", 3000)
+            self.update_properties_panel(self.canvas.selected_obstacle)
+            return
+        
         try:
             # Store old values for potential revert
             old_x = self.canvas.selected_obstacle['x']
@@ -98,9 +112,13 @@ class MainWindow(QMainWindow):
                 new_value = float(value)
                 # Normalize rotation to 0-360 range
                 new_value = new_value % 360
+                if new_value == old_rotation:
+                    return  # Unchanged (editingFinished also fires on focus loss)
                 self.canvas.selected_obstacle['rotation'] = new_value
             else:
                 new_value = int(value)
+                if new_value == self.canvas.selected_obstacle.get(property_name):
+                    return  # Unchanged, nothing to re-check or redraw
                 
                 if property_name == 'x':
                     self.canvas.selected_obstacle['x'] = new_value
@@ -121,10 +139,11 @@ class MainWindow(QMainWindow):
                         self.update_properties_panel(self.canvas.selected_obstacle)
                         return
             
+            self.canvas.obstacle_changed(self.canvas.selected_obstacle)
+            
             # Check for overlap after change (skip for rotation-only changes)
-            if property_name != 'rotation' and self.canvas.collision_detector.check_overlap(
+            if property_name != 'rotation' and self.canvas.check_obstacle_overlap(
                 self.canvas.selected_obstacle, 
-                self.canvas.obstacles, 
                 exclude=self.canvas.selected_obstacle
             ):
                 # Revert changes
@@ -133,12 +152,13 @@ class MainWindow(QMainWindow):
                 self.canvas.selected_obstacle['width'] = old_width
                 self.canvas.selected_obstacle['height'] = old_height
                 self.canvas.selected_obstacle['rotation'] = old_rotation
+                self.canvas.obstacle_changed(self.canvas.selected_obstacle)
                 
                 self.status_bar.showMessage("Cannot apply change: Would overlap with another obstacle", 3000)
                 self.update_properties_panel(self.canvas.selected_obstacle)
             else:
                 # Update successful
-                self.canvas.update()
+                self.canvas.schedule_repaint()
                 self.status_bar.showMessage(f"Property {property_name} updated", 2000)
                 
         except ValueError:
@@ -156,6 +176,9 @@ class MainWindow(QMainWindow):
             if not distance_text:
                 self.status_bar.showMessage("Please enter an expansion distance", 3000)
                 return
+            if not _FLOAT_RE.match(distance_text):
+                self.status_bar.showMessage("Invalid expansion distance value", 3000)
+                return
             
             distance = float(distance_text)
             if distance <= 0:
@@ -180,13 +203,15 @@ class MainWindow(QMainWindow):
                     'west': distance
                 }
                 # Update UI fields to show the initialized values
+                self.ensure_directional_rows()
                 self.expansion_north_input.setText(str(distance))
                 self.expansion_south_input.setText(str(distance))
                 self.expansion_east_input.setText(str(distance))
                 self.expansion_west_input.setText(str(distance))
             
             # Update canvas
-            self.canvas.update()
+            self.canvas.obstacle_changed(self.canvas.selected_obstacle)
+            self.canvas.schedule_repaint()
             
             method_name = ObstacleExpander.get_expansion_method_name(method)
             
@@ -213,6 +238,10 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage(f"Directional expansion not supported for {obstacle_type}", 3000)
             return
         
+        if not _FLOAT_RE.match(value):
+            self.status_bar.showMessage("Invalid expansion value", 3000)
+            return
+        
         try:
             expansion_value = float(value)
             if expansion_value < 0:
@@ -235,7 +264,8 @@ class MainWindow(QMainWindow):
             self.canvas.selected_obstacle['use_directional_expansion'] = True
             
             # Update canvas immediately
-            self.canvas.update()
+            self.canvas.obstacle_changed(self.canvas.selected_obstacle)
+            self.canvas.schedule_repaint()
             
             self.status_bar.showMessage(f"Directional expansion ({direction}): {expansion_value}px applied", 2000)
             
@@ -256,6 +286,7 @@ class MainWindow(QMainWindow):
         
         # Update obstacle's force_convex_hull setting
         self.canvas.selected_obstacle['force_convex_hull'] = checked
+        self.canvas.obstacle_changed(self.canvas.selected_obstacle)
         
         # Update button text
         if checked:
@@ -266,7 +297,7 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage("Concave mode enabled - custom polygon shape will be preserved", 3000)
         
         # Redraw canvas to show changes
-        self.canvas.update()
+        self.canvas.schedule_repaint()
     
     def delete_selected_obstacle(self):
         """Delete the currently selected obstacle via button"""
@@ -319,6 +350,29 @@ class MainWindow(QMainWindow):
         """Clear all obstacles from canvas"""
         self.canvas.clear_all_obstacles()
     
+    def ensure_directional_rows(self):
+        """Build the N/S/E/W expansion inputs and Apply buttons on first use"""
+        if getattr(self, 'expansion_north_input', None) is not None:
+            return
+        
+        rows = self._build_directional_rows()
+        self.expansion_north_input, self.apply_north_btn = rows['north']
+        self.expansion_south_input, self.apply_south_btn = rows['south']
+        self.expansion_east_input, self.apply_east_btn = rows['east']
+        self.expansion_west_input, self.apply_west_btn = rows['west']
+    
+    def disable_directional_rows(self):
+        """Clear, disable and hide the directional expansion rows (if built yet)"""
+        if getattr(self, 'expansion_north_input', None) is not None:
+            for field in (self.expansion_north_input, self.expansion_south_input,
+                          self.expansion_east_input, self.expansion_west_input):
+                field.clear()
+                field.setEnabled(False)
+            for button in (self.apply_north_btn, self.apply_south_btn,
+                           self.apply_east_btn, self.apply_west_btn):
+                button.setEnabled(False)
+        self.directional_grid.setVisible(False)
+    
     def update_properties_panel(self, obstacle=None):
         """Update the properties panel with selected obstacle data"""
         if obstacle is None:
@@ -329,10 +383,6 @@ class MainWindow(QMainWindow):
             self.height_input.clear()
             self.rotation_input.clear()
             self.expansion_distance_input.clear()
-            self.expansion_north_input.clear()
-            self.expansion_south_input.clear()
-            self.expansion_east_input.clear()
-            self.expansion_west_input.clear()
             
             # Disable editing when no obstacle selected
             self.pos_x_input.setEnabled(False)
@@ -346,15 +396,7 @@ class MainWindow(QMainWindow):
             self.delete_btn.setEnabled(False)
             self.convex_hull_toggle.setEnabled(False)
             self.convex_hull_toggle.setChecked(False)
-            self.expansion_north_input.setEnabled(False)
-            self.expansion_south_input.setEnabled(False)
-            self.expansion_east_input.setEnabled(False)
-            self.expansion_west_input.setEnabled(False)
-            self.apply_north_btn.setEnabled(False)
-            self.apply_south_btn.setEnabled(False)
-            self.apply_east_btn.setEnabled(False)
-            self.apply_west_btn.setEnabled(False)
-            self.directional_grid.setVisible(False)
+            self.disable_directional_rows()
         else:
             obstacle_type = obstacle.get('type', 'Unknown')
             # Display custom polygon nicely
@@ -375,11 +417,9 @@ class MainWindow(QMainWindow):
             self.expansion_distance_input.setText(str(expansion_distance))
             
             expansion_method = obstacle.get('expansion_method', ObstacleExpander.METHOD_GENERALIZED)
-            # Find and set the correct combo box index
-            for i in range(self.expansion_method_combo.count()):
-                if self.expansion_method_combo.itemData(i) == expansion_method:
-                    self.expansion_method_combo.setCurrentIndex(i)
-                    break
+            method_index = self._method_index.get(expansion_method)
+            if method_index is not None:
+                self.expansion_method_combo.setCurrentIndex(method_index)
             
             # Handle directional expansion (basic shapes: rectangle, triangle, pentagon, hexagon)
             supports_directional = obstacle_type in ['rectangle', 'triangle', 'pentagon', 'hexagon']
@@ -388,6 +428,7 @@ class MainWindow(QMainWindow):
                 directional_exp = obstacle.get('directional_expansion', {
                     'north': 0.0, 'south': 0.0, 'east': 0.0, 'west': 0.0
                 })
+                self.ensure_directional_rows()
                 self.expansion_north_input.setText(str(directional_exp.get('north', 0)))
                 self.expansion_south_input.setText(str(directional_exp.get('south', 0)))
                 self.expansion_east_input.setText(str(directional_exp.get('east', 0)))
@@ -412,19 +453,7 @@ class MainWindow(QMainWindow):
                 elif obstacle_type == 'hexagon':
                     self.directional_expansion_label.setText("Directional (Hexagon)")
             else:
-                self.expansion_north_input.clear()
-                self.expansion_south_input.clear()
-                self.expansion_east_input.clear()
-                self.expansion_west_input.clear()
-                self.expansion_north_input.setEnabled(False)
-                self.expansion_south_input.setEnabled(False)
-                self.expansion_east_input.setEnabled(False)
-                self.expansion_west_input.setEnabled(False)
-                self.apply_north_btn.setEnabled(False)
-                self.apply_south_btn.setEnabled(False)
-                self.apply_east_btn.setEnabled(False)
-                self.apply_west_btn.setEnabled(False)
-                self.directional_grid.setVisible(False)
+                self.disable_directional_rows()
             
             # IMPORTANT: Only enable convex hull toggle for custom polygons
             is_custom_polygon = (obstacle_type == 'custom_polygon')
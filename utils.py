@@ -1,6 +1,15 @@
 """Utility functions for the obstacle editor"""
 import math
+import numpy as np
 from PyQt5.QtCore import QPoint, QPointF
+from PyQt5.QtGui import QPolygonF
+from collision_numba import HAS_NUMBA, fill_regular_polygons
+
+
+# Unit-circle vertex offsets of regular polygons starting at the top, by side count
+_POLY_ANGLES = {n: -np.pi / 2 + 2 * np.pi * np.arange(n) / n for n in (5, 6, 8)}
+_POLY_COS = {n: np.cos(angles) for n, angles in _POLY_ANGLES.items()}
+_POLY_SIN = {n: np.sin(angles) for n, angles in _POLY_ANGLES.items()}
 
 
 def calculate_distance(point1, point2):
@@ -18,6 +27,90 @@ def calculate_distance(point1, point2):
     return math.sqrt(dx * dx + dy * dy)
 
 
+def calculate_distance_sq(point1, point2):
+    """Calculate the squared Euclidean distance between two points
+    
+    Cheaper than calculate_distance when only comparing against a threshold.
+    
+    Args:
+        point1: QPoint or QPointF
+        point2: QPoint or QPointF
+        
+    Returns:
+        Squared distance between the two points
+    """
+    dx = point2.x() - point1.x()
+    dy = point2.y() - point1.y()
+    return dx * dx + dy * dy
+
+
+def calculate_polygon_points(cx, cy, radius, num_sides):
+    """Calculate the vertices of a regular polygon, the first one straight above the center
+    
+    Args:
+        cx, cy: Center of the polygon
+        radius: Distance from the center to each vertex
+        num_sides: Number of sides
+        
+    Returns:
+        List of QPointF
+    """
+    if num_sides not in _POLY_COS:
+        angles = -np.pi / 2 + 2 * np.pi * np.arange(num_sides) / num_sides
+        _POLY_COS[num_sides] = np.cos(angles)
+        _POLY_SIN[num_sides] = np.sin(angles)
+    
+    xs = cx + radius * _POLY_COS[num_sides]
+    ys = cy + radius * _POLY_SIN[num_sides]
+    return [QPointF(x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+
+
+def calculate_polygons_points(cx, cy, radius, num_sides):
+    """Calculate the vertices of many regular polygons in one batch
+    
+    Same result as calling calculate_polygon_points for each polygon, but the
+    trigonometry runs in one compiled loop when numba is available.
+    
+    Args:
+        cx, cy, radius: Sequences with the center and radius of each polygon
+        num_sides: Sequence with the side count of each polygon
+        
+    Returns:
+        List with a list of QPointF per polygon
+    """
+    if not HAS_NUMBA:
+        return [calculate_polygon_points(x, y, r, n) for x, y, r, n in zip(cx, cy, radius, num_sides)]
+    
+    num_sides = np.asarray(num_sides, dtype=np.int64)
+    out = np.empty((len(num_sides), 2 * int(num_sides.max(initial=0))))
+    fill_regular_polygons(np.asarray(cx, dtype=np.float64), np.asarray(cy, dtype=np.float64),
+                          np.asarray(radius, dtype=np.float64), num_sides, out)
+    
+    return [[QPointF(row[2 * k], row[2 * k + 1]) for k in range(n)]
+            for row, n in zip(out.tolist(), num_sides.tolist())]
+
+
+def polygon_from_array(vertices):
+    """Build a QPolygonF from an (N, 2) array without creating a QPointF per vertex
+    
+    The polygon is allocated at its final size and the coordinates are copied
+    straight into its point buffer.
+    
+    Args:
+        vertices: Array-like of shape (N, 2)
+        
+    Returns:
+        QPolygonF with N points
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    polygon = QPolygonF(len(vertices))
+    if len(vertices):
+        buffer = polygon.data()
+        buffer.setsize(vertices.nbytes)
+        np.frombuffer(buffer, dtype=np.float64).reshape(vertices.shape)[:] = vertices
+    return polygon
+
+
 def clamp(value, min_value, max_value):
     """Clamp a value between min and max
     